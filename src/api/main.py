@@ -118,6 +118,7 @@ async def lifespan(app: FastAPI):
     try:
         if app_state.ollama_client:
             api_logger.info("Cleaning up Ollama client...")
+            await app_state.ollama_client.close()
         if app_state.chroma_client:
             api_logger.info("Cleaning up ChromaDB client...")
         
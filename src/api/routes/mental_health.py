@@ -60,7 +60,7 @@ from ...mental_health.signal_detection import (
     calculate_crisis_score,
     initialize_nlp_models
 )
-from ...mental_health.clustering import detect_hotspots
+from ...mental_health.clustering import detect_hotspots, bulk_persist_hotspots
 from ...mental_health.alert_system import (
     process_hotspots_for_alerts,
     MentalHealthAlertSystem
@@ -410,41 +410,43 @@ async def detect_mental_health_hotspots(
             eps_km=eps_km
         )
         
-        # Save hotspots to database
+        # Save hotspots to database; new ones are inserted in one batch
         saved_hotspots = []
+        pending_hotspots = []  # New hotspots awaiting the batch insert
+        pending_locations = set()
         for hotspot_obj in hotspot_objects:
-            # Check if hotspot already exists
-            existing_result = await db.execute(
-                select(MentalHealthHotspot).where(
-                    MentalHealthHotspot.location_id == uuid.UUID(hotspot_obj.location_id),
-                    MentalHealthHotspot.is_active == True
+            # An earlier cluster in this run may already have claimed the
+            # location; bulk_persist_hotspots merges it into that row
+            if hotspot_obj.location_id not in pending_locations:
+                # Check if hotspot already exists
+                existing_result = await db.execute(
+                    select(MentalHealthHotspot).where(
+                        MentalHealthHotspot.location_id == uuid.UUID(hotspot_obj.location_id),
+                        MentalHealthHotspot.is_active == True
+                    )
                 )
-            )
-            existing = existing_result.scalar_one_or_none()
+                existing = existing_result.scalar_one_or_none()
+                
+                if existing:
+                    # Update existing hotspot
+                    existing.hotspot_score = hotspot_obj.hotspot_score
+                    existing.severity = hotspot_obj.severity
+                    existing.primary_indicators = hotspot_obj.primary_indicators
+                    existing.updated_at = datetime.now()
+                    saved_hotspots.append(existing)
+                    continue
+                
+                pending_locations.add(hotspot_obj.location_id)
             
-            if existing:
-                # Update existing hotspot
-                existing.hotspot_score = hotspot_obj.hotspot_score
-                existing.severity = hotspot_obj.severity
-                existing.primary_indicators = hotspot_obj.primary_indicators
-                existing.updated_at = datetime.now()
-                saved_hotspots.append(existing)
-            else:
-                # Create new hotspot
-                hotspot_record = MentalHealthHotspot(
-                    id=uuid.uuid4(),
-                    location_id=uuid.UUID(hotspot_obj.location_id),
-                    detected_date=datetime.now(),
-                    hotspot_score=hotspot_obj.hotspot_score,
-                    primary_indicators=hotspot_obj.primary_indicators,
-                    contributing_factors=hotspot_obj.contributing_factors,
-                    severity=hotspot_obj.severity,
-                    affected_population_estimate=hotspot_obj.affected_population_estimate,
-                    trend=hotspot_obj.trend,
-                    is_active=True
-                )
-                db.add(hotspot_record)
-                saved_hotspots.append(hotspot_record)
+            # Create new hotspot (placeholder index until the batch insert)
+            saved_hotspots.append(len(pending_hotspots))
+            pending_hotspots.append(hotspot_obj)
+        
+        created = await bulk_persist_hotspots(db, pending_hotspots)
+        saved_hotspots = [
+            created[h] if isinstance(h, int) else h
+            for h in saved_hotspots
+        ]
         
         await db.commit()
         
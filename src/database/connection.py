@@ -36,6 +36,12 @@ from ..utils.config import settings
 from ..utils.logger import api_logger
 from .models import Base
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 
 # Global engine and session factory
 _engine: Optional[AsyncEngine] = None
@@ -66,6 +72,18 @@ def get_database_url() -> str:
     return db_url
 
 
+def _orjson_serializer(value: Any) -> str:
+    """
+    Serialize JSON column values with orjson.
+    
+    Accepts NumPy scalars/arrays and non-string dict keys, which the stdlib
+    serializer would reject or stringify.
+    """
+    return orjson.dumps(
+        value, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+    ).decode()
+
+
 def create_engine() -> AsyncEngine:
     """
     Create and configure async SQLAlchemy engine.
@@ -106,6 +124,13 @@ def create_engine() -> AsyncEngine:
         "pool_recycle": 3600,  # Recycle connections after 1 hour
     }
     
+    # Faster (de)serialization for JSON columns such as metadata_json
+    if ORJSON_AVAILABLE:
+        engine_kwargs.update({
+            "json_serializer": _orjson_serializer,
+            "json_deserializer": orjson.loads,
+        })
+    
     # Add pool settings for PostgreSQL
     if "postgresql" in db_url:
         engine_kwargs.update({
@@ -1,20 +1,27 @@
 """Ollama client wrapper for async operations."""
 import os
 from typing import Optional, Dict, Any
-from ollama import Client, ResponseError, RequestError
-import asyncio
-from functools import partial
+import json
+import httpx
+from ollama import AsyncClient, Client, ResponseError, RequestError
 
 from ..utils.config import settings
 from ..utils.logger import api_logger
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 
 class OllamaClient:
     """Wrapper for Ollama client with async support."""
     
     def __init__(self, host: Optional[str] = None):
         self.host = host or settings.ollama_host
-        self.client: Optional[Client] = None
+        self.client: Optional[AsyncClient] = None
+        self._transport: Optional[httpx.AsyncHTTPTransport] = None
         self._initialized = False
     
     def initialize(self) -> bool:
@@ -26,11 +33,14 @@ class OllamaClient:
             
             # Replace localhost with 127.0.0.1 for consistency
             host = self.host.replace('localhost', '127.0.0.1')
-            self.client = Client(host=host)
             
-            # Test connection
+            # Test connection (sync probe; startup only)
             try:
-                self.client.list()  # List available models
+                Client(host=host).list()  # List available models
+                # Own the connection pool so close() can release it without
+                # reaching into the ollama client
+                self._transport = httpx.AsyncHTTPTransport()
+                self.client = AsyncClient(host=host, transport=self._transport)
                 self._initialized = True
                 api_logger.info(f"Ollama client initialized: {host}")
                 return True
@@ -65,35 +75,25 @@ class OllamaClient:
         )
         
         try:
-            # Run in thread pool to avoid blocking
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None,
-                partial(
-                    self.client.chat,
-                    model=model,
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": f"DATA:\n{data_summary}"}
-                    ],
-                    options={"temperature": 0.1, "num_ctx": 4096}
-                )
+            response = await self.client.chat(
+                model=model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": f"DATA:\n{data_summary}"}
+                ],
+                options={"temperature": 0.1, "num_ctx": 4096}
             )
             
             content = response.get('message', {}).get('content', '')
             
-            # Try to parse JSON from response
-            import json
-            try:
-                # Extract JSON from response if wrapped in text
-                if '{' in content and '}' in content:
-                    start = content.find('{')
-                    end = content.rfind('}') + 1
-                    json_str = content[start:end]
-                    parsed = json.loads(json_str)
-                    return parsed
-            except:
-                pass
+            # Try to parse JSON from response (extract if wrapped in text)
+            start = content.find('{')
+            end = content.rfind('}') + 1
+            if start != -1 and end > start:
+                try:
+                    return _json_loads(content[start:end])
+                except ValueError:
+                    pass
             
             # Fallback: parse text response
             return {
@@ -121,20 +121,20 @@ class OllamaClient:
             return "Ollama not available"
         
         try:
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None,
-                partial(
-                    self.client.generate,
-                    model=model,
-                    prompt=prompt
-                )
-            )
+            response = await self.client.generate(model=model, prompt=prompt)
             return response.get('response', '')
         except Exception as e:
             api_logger.error(f"Ollama generate error: {str(e)}")
             return f"Error: {str(e)}"
     
+    async def close(self):
+        """Close the underlying HTTP connection pool."""
+        if self._transport is not None:
+            await self._transport.aclose()
+            self._transport = None
+        self.client = None
+        self._initialized = False
+    
     def _fallback_analysis(self) -> Dict[str, Any]:
         """Fallback analysis when Ollama is unavailable."""
         return {
@@ -1,7 +1,23 @@
 import os
+import numpy as np
 import requests
 from src.utils.logger import api_logger
 
+# Health impact rules as (predicate, message). Predicates take
+# (temp, humidity, wet) and work on scalars as well as NumPy arrays.
+_HEALTH_IMPACT_RULES = [
+    (lambda t, h, wet: t > 30,
+     "High heat: Risk of dehydration and heat exhaustion. Stay hydrated."),
+    (lambda t, h, wet: t < 5,
+     "Low temperature: Risk of hypothermia and increased blood pressure. Keep warm."),
+    (lambda t, h, wet: h > 70,
+     "High humidity: May aggravate asthma and respiratory conditions."),
+    (lambda t, h, wet: h < 30,
+     "Low humidity: May cause dry skin and respiratory irritation."),
+    (lambda t, h, wet: wet,
+     "Wet conditions: Increased risk of slips/falls and joint pain (arthritis)."),
+]
+
 class WeatherService:
     def __init__(self):
         self.api_key = os.getenv("WEATHER_API_KEY")
@@ -42,22 +58,38 @@ class WeatherService:
         if not weather_data:
             return []
 
-        impacts = []
         temp = weather_data["temp"]
         humidity = weather_data["humidity"]
         condition = weather_data["condition"].lower()
+        wet = "rain" in condition or "storm" in condition
+
+        return [
+            message for rule, message in _HEALTH_IMPACT_RULES
+            if rule(temp, humidity, wet)
+        ]
+
+    def get_health_impacts_batch(self, temps, humidities, conditions):
+        """
+        Analyze health impacts for many weather readings at once.
+
+        Each rule is evaluated as one boolean mask over the whole batch.
+
+        Args:
+            temps: Temperatures in Celsius
+            humidities: Relative humidity percentages
+            conditions: Weather condition descriptions
+
+        Returns:
+            List of impact message lists, one per reading
+        """
+        temps = np.asarray(temps, dtype=np.float64)
+        humidities = np.asarray(humidities, dtype=np.float64)
+        conditions = np.char.lower(np.asarray(conditions, dtype=str))
+        wet = (np.char.find(conditions, "rain") >= 0) | (np.char.find(conditions, "storm") >= 0)
+
+        impacts = [[] for _ in range(temps.shape[0])]
+        for rule, message in _HEALTH_IMPACT_RULES:
+            for i in np.flatnonzero(rule(temps, humidities, wet)):
+                impacts[i].append(message)
 
-        if temp > 30:
-            impacts.append("High heat: Risk of dehydration and heat exhaustion. Stay hydrated.")
-        elif temp < 5:
-            impacts.append("Low temperature: Risk of hypothermia and increased blood pressure. Keep warm.")
-        
-        if humidity > 70:
-            impacts.append("High humidity: May aggravate asthma and respiratory conditions.")
-        elif humidity < 30:
-            impacts.append("Low humidity: May cause dry skin and respiratory irritation.")
-
-        if "rain" in condition or "storm" in condition:
-            impacts.append("Wet conditions: Increased risk of slips/falls and joint pain (arthritis).")
-        
         return impacts
@@ -1,5 +1,9 @@
 # Marketplace Service stub implementation
 
+from collections import defaultdict
+from functools import reduce
+
+
 class MarketplaceService:
     """A simple stub for the marketplace service.
 
@@ -11,6 +15,8 @@ class MarketplaceService:
     def __init__(self):
         # Initialize any required state here
         self.resources = []
+        # Inverted indexes: key -> value -> positions in self.resources
+        self._indexes = defaultdict(lambda: defaultdict(set))
 
     def add_resource(self, resource):
         """Add a resource to the marketplace.
@@ -18,19 +24,46 @@ class MarketplaceService:
         Args:
             resource (dict): A dictionary representing the resource.
         """
+        idx = len(self.resources)
         self.resources.append(resource)
+        for k, v in resource.items():
+            try:
+                self._indexes[k][v].add(idx)
+            except TypeError:
+                # Unhashable values are matched by scanning instead
+                continue
         return True
 
     def match_resources(self, criteria):
         """Return resources matching the given criteria.
 
-        This is a naive implementation that filters the stored resources.
+        Hashable criteria are resolved by intersecting the per-key indexes;
+        anything else (None or unhashable values) is checked on the
+        remaining candidates.
         """
-        matches = []
-        for r in self.resources:
-            if all(r.get(k) == v for k, v in criteria.items()):
-                matches.append(r)
-        return matches
+        indexed, scanned = [], []
+        for k, v in criteria.items():
+            if v is None:
+                # Also matches resources that lack the key entirely
+                scanned.append((k, v))
+                continue
+            try:
+                hash(v)
+            except TypeError:
+                scanned.append((k, v))
+                continue
+            index = self._indexes.get(k)
+            indexed.append(index.get(v, set()) if index else set())
+
+        if indexed:
+            candidate_ids = sorted(reduce(set.intersection, indexed))
+        else:
+            candidate_ids = range(len(self.resources))
+
+        return [
+            self.resources[i] for i in candidate_ids
+            if all(self.resources[i].get(k) == v for k, v in scanned)
+        ]
 
     def get_all_resources(self):
         """Return all stored resources."""
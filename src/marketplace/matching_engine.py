@@ -9,9 +9,11 @@ from typing import List, Dict, Tuple, Optional, Any
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 import math
+import time
+import numpy as np
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, func
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, insert, and_, or_, func, case
+from sqlalchemy.orm import selectinload, lazyload
 
 from ..database.resource_models import (
     ResourceRequest, ResourceInventory, ResourceMatch, ResourceProvider,
@@ -20,6 +22,50 @@ from ..database.resource_models import (
 from ..database.models import Location
 from ..utils.logger import api_logger
 
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+def _haversine_py(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Haversine distance in kilometers (pure Python)."""
+    R = 6371.0  # Earth radius in km
+    
+    dlat = math.radians(lat2 - lat1)
+    dlon = math.radians(lon2 - lon1)
+    
+    a = (
+        math.sin(dlat / 2) ** 2 +
+        math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) *
+        math.sin(dlon / 2) ** 2
+    )
+    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+    
+    return R * c
+
+
+# Compiled to native code when numba is installed (optional dependency)
+_haversine_kernel = (
+    njit(cache=True, fastmath=True)(_haversine_py) if NUMBA_AVAILABLE else _haversine_py
+)
+
+
+# Geographic score lookup table: 100 * exp(-d / 200) sampled at distance breakpoints (km).
+# np.interp over this table replaces a per-candidate math.exp call.
+_DIST_BREAKS = np.array([0, 10, 25, 50, 100, 150, 200, 300, 500, 750, 1000, 2000], dtype=np.float64)
+_DIST_SCORES = 100.0 * np.exp(-_DIST_BREAKS / 200.0)
+
+# Column order of the per-candidate score component matrix
+_SCORE_COMPONENTS = ('geographic', 'urgency', 'quality', 'cost', 'reliability', 'availability')
+
+# Short-lived cache for predict_future_needs, keyed on (location_id, days_ahead).
+# Absorbs dashboard polling; entries are at most _PREDICTION_CACHE_TTL seconds stale.
+_PREDICTION_CACHE: Dict[Tuple[str, int], Tuple[float, Dict[str, Any]]] = {}
+_PREDICTION_CACHE_TTL = 30.0
+_PREDICTION_CACHE_MAXSIZE = 1024
+
 
 @dataclass
 class MatchScore:
@@ -62,6 +108,14 @@ class ResourceMatchingEngine:
             'reliability': 0.15,     # Provider reliability
             'availability': 0.05,    # Immediate availability
         }
+        self._weights_vec = np.array([self.weights[name] for name in _SCORE_COMPONENTS])
+        
+        # Matches created per request, and how many nearest candidates
+        # (matches_per_request * shortlist_factor) reach the full scorer when
+        # the request location is known. A larger factor trades throughput for
+        # a better chance that a distant but higher-quality provider is kept.
+        self.matches_per_request = 5
+        self.shortlist_factor = 3
         
         # Urgency multipliers
         self.urgency_multipliers = {
@@ -101,7 +155,7 @@ class ResourceMatchingEngine:
                 select(ResourceRequest)
                 .where(ResourceRequest.id == request_id)
                 .where(ResourceRequest.status == "OPEN")
-                .options(selectinload(ResourceRequest.location))
+                .options(lazyload(ResourceRequest.location))
             )
             requests = [result.scalar_one_or_none()]
             requests = [r for r in requests if r is not None]
@@ -109,7 +163,7 @@ class ResourceMatchingEngine:
             result = await self.session.execute(
                 select(ResourceRequest)
                 .where(ResourceRequest.status == "OPEN")
-                .options(selectinload(ResourceRequest.location))
+                .options(lazyload(ResourceRequest.location))
             )
             requests = result.scalars().all()
         
@@ -117,35 +171,50 @@ class ResourceMatchingEngine:
             api_logger.info("No open requests to match")
             return []
         
-        matches_created = []
+        # Fetch request coordinates only, without hydrating Location objects
+        req_location_ids = {r.location_id for r in requests if r.location_id}
+        location_cache: Dict[Any, Tuple[float, float]] = {}
+        if req_location_ids:
+            loc_result = await self.session.execute(
+                select(Location.id, Location.latitude, Location.longitude)
+                .where(Location.id.in_(req_location_ids))
+            )
+            location_cache = {row.id: (row.latitude, row.longitude) for row in loc_result}
+        
+        new_match_rows: List[Dict[str, Any]] = []
         
         for request in requests:
-            # Find compatible inventory
-            compatible_inventory = await self._find_compatible_inventory(request)
+            # Find compatible inventory (with server-side distance when location is known)
+            origin = location_cache.get(request.location_id)
+            candidates = await self._find_compatible_inventory(request, origin)
             
-            if not compatible_inventory:
+            if not candidates:
                 api_logger.warning(f"No compatible inventory for request {request.id}")
                 continue
             
+            compatible_inventory = [inventory for inventory, _ in candidates]
+            distances_km = [distance for _, distance in candidates]
+            
             # Calculate match scores
-            scored_matches = []
-            for inventory in compatible_inventory:
-                score = await self.calculate_match_score(request, inventory)
-                scored_matches.append((inventory, score))
+            scores = await self.score_batch(request, compatible_inventory, distances_km)
+            scored_matches = list(zip(compatible_inventory, scores))
             
             # Sort by score (descending)
             scored_matches.sort(key=lambda x: x[1].total_score, reverse=True)
+            top_matches = scored_matches[:self.matches_per_request]
             
-            # Create matches (top 5 per request)
-            for inventory, score in scored_matches[:5]:
-                # Check if match already exists
-                existing = await self.session.execute(
-                    select(ResourceMatch)
-                    .where(ResourceMatch.request_id == request.id)
-                    .where(ResourceMatch.inventory_id == inventory.id)
-                    .where(ResourceMatch.status == MatchStatus.PENDING)
-                )
-                if existing.scalar_one_or_none():
+            # Skip inventory that already has a pending match for this request
+            existing = await self.session.execute(
+                select(ResourceMatch.inventory_id)
+                .where(ResourceMatch.request_id == request.id)
+                .where(ResourceMatch.inventory_id.in_([inv.id for inv, _ in top_matches]))
+                .where(ResourceMatch.status == MatchStatus.PENDING)
+            )
+            already_matched = set(existing.scalars().all())
+            
+            # Create matches (top matches_per_request per request)
+            for inventory, score in top_matches:
+                if inventory.id in already_matched:
                     continue
                 
                 # Calculate quantity to match
@@ -156,34 +225,43 @@ class ResourceMatchingEngine:
                 if quantity_matched <= 0:
                     continue
                 
-                # Create match
-                match = ResourceMatch(
-                    request_id=request.id,
-                    inventory_id=inventory.id,
-                    provider_id=inventory.provider_id,
-                    quantity_matched=quantity_matched,
-                    match_score=score.total_score,
-                    status=MatchStatus.PENDING,
-                    metadata_json={
+                # Auto-accept high-scoring matches
+                auto_accept = score.total_score >= auto_accept_threshold
+                
+                new_match_rows.append({
+                    'request_id': request.id,
+                    'inventory_id': inventory.id,
+                    'provider_id': inventory.provider_id,
+                    'quantity_matched': quantity_matched,
+                    'match_score': score.total_score,
+                    'status': MatchStatus.ACCEPTED if auto_accept else MatchStatus.PENDING,
+                    'accepted_at': datetime.now() if auto_accept else None,
+                    'metadata_json': {
                         'geographic_score': score.geographic_score,
                         'urgency_score': score.urgency_score,
                         'quality_score': score.quality_score,
                         'cost_score': score.cost_score,
                         'reliability_score': score.reliability_score,
                         'availability_score': score.availability_score,
-                    }
+                    },
+                })
+        
+        # Insert all matches in one batched statement
+        matches_created: List[ResourceMatch] = []
+        if new_match_rows:
+            result = await self.session.scalars(
+                insert(ResourceMatch)
+                .returning(ResourceMatch)
+                .options(lazyload("*")),  # Relationships are not needed here
+                new_match_rows
+            )
+            matches_created = list(result.all())
+        
+        for match in matches_created:
+            if match.status == MatchStatus.ACCEPTED:
+                api_logger.info(
+                    f"Auto-accepted match {match.id} with score {match.match_score:.2f}"
                 )
-                
-                self.session.add(match)
-                matches_created.append(match)
-                
-                # Auto-accept high-scoring matches
-                if score.total_score >= auto_accept_threshold:
-                    match.status = MatchStatus.ACCEPTED
-                    match.accepted_at = datetime.now()
-                    api_logger.info(
-                        f"Auto-accepted match {match.id} with score {score.total_score:.2f}"
-                    )
         
         await self.session.commit()
         api_logger.info(f"Created {len(matches_created)} matches")
@@ -192,20 +270,38 @@ class ResourceMatchingEngine:
     
     async def _find_compatible_inventory(
         self,
-        request: ResourceRequest
-    ) -> List[ResourceInventory]:
+        request: ResourceRequest,
+        origin: Optional[Tuple[float, float]] = None
+    ) -> List[Tuple[ResourceInventory, Optional[float]]]:
         """
         Find compatible inventory for a request.
         
+        When the request coordinates are known, the distance to each provider
+        is computed in SQL and only the nearest
+        matches_per_request * shortlist_factor rows are returned for scoring.
+        
         Args:
             request: Resource request
+            origin: (latitude, longitude) of the request location, if known
             
         Returns:
-            List of compatible inventory items
+            List of (inventory item, distance in km or None) tuples
         """
-        # Base query
+        if origin:
+            distance_expr = self._distance_km_expr(*origin)
+            query = (
+                select(ResourceInventory, distance_expr.label("distance_km"))
+                .join(ResourceProvider, ResourceInventory.provider_id == ResourceProvider.id)
+                .outerjoin(Location, ResourceProvider.location_id == Location.id)
+                .order_by(distance_expr.asc().nulls_last())
+                .limit(self.matches_per_request * self.shortlist_factor)
+            )
+        else:
+            query = select(ResourceInventory)
+        
+        # Base filters
         query = (
-            select(ResourceInventory)
+            query
             .where(ResourceInventory.resource_type == request.resource_type)
             .where(ResourceInventory.is_active == True)
             .where(
@@ -226,9 +322,10 @@ class ResourceMatchingEngine:
             )
         
         result = await self.session.execute(query)
-        inventory_items = result.scalars().all()
+        if origin:
+            return [(row[0], row[1]) for row in result.all()]
         
-        return list(inventory_items)
+        return [(inventory, None) for inventory in result.scalars().all()]
     
     async def calculate_match_score(
         self,
@@ -245,85 +342,124 @@ class ResourceMatchingEngine:
         Returns:
             MatchScore object with breakdown
         """
-        # Geographic score (0-100)
-        geographic_score = await self._calculate_geographic_score(request, inventory)
-        
-        # Urgency score (0-100)
-        urgency_score = self._calculate_urgency_score(request)
-        
-        # Quality score (0-100)
-        quality_score = self._calculate_quality_score(inventory)
-        
-        # Cost score (0-100)
-        cost_score = self._calculate_cost_score(inventory)
-        
-        # Reliability score (0-100)
-        reliability_score = await self._calculate_reliability_score(inventory.provider_id)
+        scores = await self.score_batch(request, [inventory])
+        return scores[0]
+    
+    async def score_batch(
+        self,
+        request: ResourceRequest,
+        inventory_items: List[ResourceInventory],
+        distances_km: Optional[List[Optional[float]]] = None
+    ) -> List[MatchScore]:
+        """
+        Calculate match scores for all candidate inventory of one request.
         
-        # Availability score (0-100)
-        availability_score = self._calculate_availability_score(inventory, request)
+        Distances to every provider are computed in a single vectorized pass,
+        unless they were already computed by the database.
         
-        # Weighted total score
-        total_score = (
-            self.weights['geographic'] * geographic_score +
-            self.weights['urgency'] * urgency_score +
-            self.weights['quality'] * quality_score +
-            self.weights['cost'] * cost_score +
-            self.weights['reliability'] * reliability_score +
-            self.weights['availability'] * availability_score
-        )
+        Args:
+            request: Resource request
+            inventory_items: Candidate inventory items
+            distances_km: Precomputed distances (None where location unknown)
+            
+        Returns:
+            List of MatchScore objects, in the same order as inventory_items
+        """
+        # Geographic scores (0-100)
+        if distances_km is not None:
+            geographic_scores = self._distance_scores(distances_km)
+        else:
+            geographic_scores = await self._calculate_geographic_scores(request, inventory_items)
         
-        # Apply urgency multiplier
+        # Urgency score (0-100), identical for every candidate
+        urgency_score = self._calculate_urgency_score(request)
         urgency_mult = self.urgency_multipliers.get(request.urgency, 1.0)
-        total_score = min(100.0, total_score * urgency_mult)
-        
-        return MatchScore(
-            total_score=total_score,
-            geographic_score=geographic_score,
-            urgency_score=urgency_score,
-            quality_score=quality_score,
-            cost_score=cost_score,
-            reliability_score=reliability_score,
-            availability_score=availability_score,
-        )
+        
+        # Component matrix: one row per candidate, columns in _SCORE_COMPONENTS order
+        components = np.empty((len(inventory_items), len(_SCORE_COMPONENTS)))
+        components[:, 0] = geographic_scores
+        components[:, 1] = urgency_score
+        components[:, 2] = [self._calculate_quality_score(inv) for inv in inventory_items]
+        components[:, 3] = [self._calculate_cost_score(inv) for inv in inventory_items]
+        components[:, 4] = [
+            self._calculate_reliability_score(inv.provider) for inv in inventory_items
+        ]
+        components[:, 5] = [
+            self._calculate_availability_score(inv, request) for inv in inventory_items
+        ]
+        
+        # Weighted total score with urgency multiplier applied
+        totals = np.minimum(100.0, (components @ self._weights_vec) * urgency_mult)
+        
+        return [
+            MatchScore(
+                total_score=float(total),
+                geographic_score=float(row[0]),
+                urgency_score=float(row[1]),
+                quality_score=float(row[2]),
+                cost_score=float(row[3]),
+                reliability_score=float(row[4]),
+                availability_score=float(row[5]),
+            )
+            for total, row in zip(totals, components)
+        ]
     
-    async def _calculate_geographic_score(
+    async def _calculate_geographic_scores(
         self,
         request: ResourceRequest,
-        inventory: ResourceInventory
-    ) -> float:
+        inventory_items: List[ResourceInventory]
+    ) -> np.ndarray:
         """
-        Calculate geographic proximity score.
+        Calculate geographic proximity scores for a batch of candidates.
         
-        Closer = higher score (0-100).
+        Closer = higher score (0-100). Unknown locations get a neutral 50.
         """
-        if not request.location_id or not inventory.provider.location_id:
-            return 50.0  # Neutral score if location unknown
+        scores = np.full(len(inventory_items), 50.0)  # Neutral score if location unknown
+        if not request.location_id or not inventory_items:
+            return scores
         
-        # Get locations
-        req_loc_result = await self.session.execute(
-            select(Location).where(Location.id == request.location_id)
-        )
-        req_location = req_loc_result.scalar_one_or_none()
+        provider_location_ids = [inv.provider.location_id for inv in inventory_items]
+        location_ids = {lid for lid in provider_location_ids if lid}
+        if not location_ids:
+            return scores
+        location_ids.add(request.location_id)
         
-        prov_loc_result = await self.session.execute(
-            select(Location).where(Location.id == inventory.provider.location_id)
+        # Fetch all needed coordinates in one query
+        result = await self.session.execute(
+            select(Location.id, Location.latitude, Location.longitude)
+            .where(Location.id.in_(location_ids))
         )
-        prov_location = prov_loc_result.scalar_one_or_none()
+        coords = {row.id: (row.latitude, row.longitude) for row in result}
         
-        if not req_location or not prov_location:
-            return 50.0
+        req_coords = coords.get(request.location_id)
+        if not req_coords:
+            return scores
         
-        # Calculate distance (Haversine formula)
-        distance_km = self._haversine_distance(
-            req_location.latitude, req_location.longitude,
-            prov_location.latitude, prov_location.longitude
+        known = np.array([lid in coords for lid in provider_location_ids], dtype=bool)
+        if not known.any():
+            return scores
+        
+        prov_coords = np.array(
+            [coords[lid] for lid in provider_location_ids if lid in coords],
+            dtype=np.float64
+        )
+        distances_km = self._haversine_distances(
+            req_coords[0], req_coords[1], prov_coords[:, 0], prov_coords[:, 1]
         )
         
-        # Score: 100 at 0km, 0 at 1000km+
-        # Exponential decay
-        score = 100.0 * math.exp(-distance_km / 200.0)
-        return max(0.0, min(100.0, score))
+        # Score: 100 at 0km, ~0 at 1000km+ (exponential decay via lookup table)
+        scores[known] = np.interp(distances_km, _DIST_BREAKS, _DIST_SCORES)
+        return scores
+    
+    @staticmethod
+    def _distance_scores(distances_km: List[Optional[float]]) -> np.ndarray:
+        """Map distances to geographic scores (0-100); None gets a neutral 50."""
+        distances = np.array(
+            [np.nan if d is None else d for d in distances_km], dtype=np.float64
+        )
+        scores = np.interp(distances, _DIST_BREAKS, _DIST_SCORES)
+        scores[np.isnan(distances)] = 50.0
+        return scores
     
     def _calculate_urgency_score(self, request: ResourceRequest) -> float:
         """Calculate urgency-based score."""
@@ -371,14 +507,12 @@ class ResourceMatchingEngine:
         
         return max(0.0, min(100.0, score))
     
-    async def _calculate_reliability_score(self, provider_id: str) -> float:
-        """Calculate provider reliability score."""
-        # Get provider
-        result = await self.session.execute(
-            select(ResourceProvider).where(ResourceProvider.id == provider_id)
-        )
-        provider = result.scalar_one_or_none()
+    def _calculate_reliability_score(self, provider: Optional[ResourceProvider]) -> float:
+        """
+        Calculate provider reliability score.
         
+        Uses the provider eager-loaded with the inventory item.
+        """
         if not provider:
             return 0.0
         
@@ -417,17 +551,56 @@ class ResourceMatchingEngine:
         
         Returns distance in kilometers.
         """
+        return float(_haversine_kernel(
+            float(lat1), float(lon1), float(lat2), float(lon2)
+        ))
+    
+    @staticmethod
+    def _distance_km_expr(lat: float, lon: float):
+        """
+        SQL expression for the great-circle distance from (lat, lon) to Location.
+        
+        Uses the spherical law of cosines so the database can compute and sort
+        by distance. Returns distance in kilometers (NULL if location unknown).
+        """
         R = 6371.0  # Earth radius in km
         
-        dlat = math.radians(lat2 - lat1)
-        dlon = math.radians(lon2 - lon1)
+        lat_rad = math.radians(lat)
+        lon_rad = math.radians(lon)
+        loc_lat = func.radians(Location.latitude)
         
-        a = (
-            math.sin(dlat / 2) ** 2 +
-            math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) *
-            math.sin(dlon / 2) ** 2
+        cos_angle = (
+            math.sin(lat_rad) * func.sin(loc_lat) +
+            math.cos(lat_rad) * func.cos(loc_lat) *
+            func.cos(func.radians(Location.longitude) - lon_rad)
+        )
+        # Clamp rounding error outside acos' domain at both ends
+        cos_angle = case(
+            (cos_angle > 1.0, 1.0),
+            (cos_angle < -1.0, -1.0),
+            else_=cos_angle,
         )
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+        
+        return R * func.acos(cos_angle)
+    
+    @staticmethod
+    def _haversine_distances(
+        lat: float, lon: float, lats: np.ndarray, lons: np.ndarray
+    ) -> np.ndarray:
+        """
+        Vectorized Haversine distance from one point to many.
+        
+        Returns distances in kilometers.
+        """
+        R = 6371.0  # Earth radius in km
+        
+        lat1 = np.radians(lat)
+        lat2 = np.radians(lats)
+        dlat = lat2 - lat1
+        dlon = np.radians(lons - lon)
+        
+        a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+        c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
         
         return R * c
     
@@ -446,6 +619,13 @@ class ResourceMatchingEngine:
         Returns:
             Dictionary with predicted resource needs
         """
+        cache_key = (str(location_id), days_ahead)
+        cached = _PREDICTION_CACHE.get(cache_key)
+        if cached and time.monotonic() - cached[0] < _PREDICTION_CACHE_TTL:
+            predictions = dict(cached[1])
+            predictions['predicted_needs'] = dict(predictions['predicted_needs'])
+            return predictions
+        
         # TODO: Integrate with outbreak prediction models
         # For now, return placeholder structure
         
@@ -481,6 +661,15 @@ class ResourceMatchingEngine:
                 'NURSE': int(15 * case_multiplier),
             }
         
+        # Evict the oldest entry once full (dicts keep insertion order)
+        _PREDICTION_CACHE.pop(cache_key, None)
+        if len(_PREDICTION_CACHE) >= _PREDICTION_CACHE_MAXSIZE:
+            _PREDICTION_CACHE.pop(next(iter(_PREDICTION_CACHE)))
+        _PREDICTION_CACHE[cache_key] = (
+            time.monotonic(),
+            {**predictions, 'predicted_needs': dict(predictions['predicted_needs'])}
+        )
+        
         return predictions
     
     async def optimize_logistics(
@@ -6,7 +6,9 @@ main epidemic monitoring system.
 """
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
+from bisect import bisect_right
 from dataclasses import dataclass
+from functools import lru_cache
 
 from ..utils.logger import api_logger
 from .models import (
@@ -18,6 +20,68 @@ from .models import (
 from ..database.models import Alert, AlertSeverity, AlertStatus, Location
 
 
+# Severity levels in ascending order; index = number of thresholds reached
+_SEVERITY_LEVELS = (
+    AlertSeverity.INFO,
+    AlertSeverity.WARNING,
+    AlertSeverity.SEVERE,
+    AlertSeverity.CRITICAL,
+)
+
+# Minimum hotspot score for a WARNING alert
+_WARNING_THRESHOLD = 4.0
+
+# Message prefix per alert severity
+_SEVERITY_PREFIX = {
+    AlertSeverity.CRITICAL: "🚨 CRITICAL",
+    AlertSeverity.SEVERE: "⚠️ SEVERE",
+    AlertSeverity.WARNING: "⚠️ WARNING",
+    AlertSeverity.INFO: "ℹ️ INFO"
+}
+
+# Recommended action templates
+_HIGH_SEVERITIES = frozenset({AlertSeverity.SEVERE, AlertSeverity.CRITICAL})
+_BASE_ACTIONS = (
+    "Increase mental health resource availability in affected area",
+    "Coordinate with local healthcare providers",
+)
+_HIGH_SEVERITY_ACTIONS = (
+    "Activate crisis response team",
+    "Increase hotline capacity",
+    "Deploy mobile mental health units if available",
+)
+_CRISIS_ACTIONS = (
+    "Implement suicide prevention protocols",
+    "Coordinate with emergency services",
+)
+_INDICATOR_ACTIONS = (
+    (MentalHealthIndicator.ANXIETY, "Provide anxiety management resources and information"),
+    (MentalHealthIndicator.DEPRESSION, "Increase depression screening and support services"),
+    (MentalHealthIndicator.SUBSTANCE_ABUSE, "Coordinate with substance abuse treatment centers"),
+)
+_INCREASING_TREND_ACTIONS = (
+    "Monitor trend closely and prepare for escalation",
+    "Pre-position additional resources",
+)
+
+# Alert recipients (in production, would be loaded from config/database)
+_BASE_RECIPIENTS = (
+    "mental_health_team@epispy.local",
+    "public_health_department@epispy.local",
+)
+_CRITICAL_RECIPIENTS = (
+    "crisis_response_team@epispy.local",
+    "emergency_services@epispy.local",
+    "health_department_director@epispy.local",
+)
+
+
+@lru_cache(maxsize=1024)
+def _location_recipient(location_name: str) -> str:
+    """Health department address for a location name."""
+    return f"health_dept_{location_name.lower().replace(' ', '_')}@epispy.local"
+
+
 @dataclass
 class AlertRecommendation:
     """Alert recommendation from hotspot analysis."""
@@ -43,6 +107,12 @@ class MentalHealthAlertSystem:
         """
         self.threshold_severe = threshold_severe
         self.threshold_critical = threshold_critical
+        
+        # Ascending thresholds for _SEVERITY_LEVELS[1:]. Each is capped by the
+        # one above it so the bisect matches the critical > severe > warning
+        # precedence even if the thresholds are passed out of order.
+        severe = min(threshold_severe, threshold_critical)
+        self._severity_thresholds = (min(_WARNING_THRESHOLD, severe), severe, threshold_critical)
     
     def evaluate_hotspot_for_alert(
         self,
@@ -59,22 +129,10 @@ class MentalHealthAlertSystem:
         Returns:
             Alert recommendation
         """
-        should_alert = False
-        severity = AlertSeverity.INFO
-        
         # Determine alert severity based on hotspot score
-        if hotspot.hotspot_score >= self.threshold_critical:
-            should_alert = True
-            severity = AlertSeverity.CRITICAL
-        elif hotspot.hotspot_score >= self.threshold_severe:
-            should_alert = True
-            severity = AlertSeverity.SEVERE
-        elif hotspot.hotspot_score >= 4.0:
-            should_alert = True
-            severity = AlertSeverity.WARNING
-        else:
-            should_alert = False
-            severity = AlertSeverity.INFO
+        level = bisect_right(self._severity_thresholds, hotspot.hotspot_score)
+        severity = _SEVERITY_LEVELS[level]
+        should_alert = level > 0
         
         # Build alert message
         message = self._build_alert_message(hotspot, severity)
@@ -104,12 +162,7 @@ class MentalHealthAlertSystem:
         
         indicators_str = ", ".join(hotspot.primary_indicators[:3])
         
-        severity_prefix = {
-            AlertSeverity.CRITICAL: "🚨 CRITICAL",
-            AlertSeverity.SEVERE: "⚠️ SEVERE",
-            AlertSeverity.WARNING: "⚠️ WARNING",
-            AlertSeverity.INFO: "ℹ️ INFO"
-        }.get(severity, "ℹ️")
+        severity_prefix = _SEVERITY_PREFIX.get(severity, "ℹ️")
         
         message = (
             f"{severity_prefix} Mental Health Hotspot Detected\n\n"
@@ -136,36 +189,24 @@ class MentalHealthAlertSystem:
         severity: AlertSeverity
     ) -> List[str]:
         """Generate recommended actions based on hotspot."""
-        actions = []
+        indicators = set(hotspot.primary_indicators or ())
         
         # Base actions for all hotspots
-        actions.append("Increase mental health resource availability in affected area")
-        actions.append("Coordinate with local healthcare providers")
+        actions = list(_BASE_ACTIONS)
         
         # Severity-specific actions
-        if severity in [AlertSeverity.SEVERE, AlertSeverity.CRITICAL]:
-            actions.append("Activate crisis response team")
-            actions.append("Increase hotline capacity")
-            actions.append("Deploy mobile mental health units if available")
+        if severity in _HIGH_SEVERITIES:
+            actions.extend(_HIGH_SEVERITY_ACTIONS)
             
-            if "CRISIS" in hotspot.primary_indicators or "SUICIDAL_IDEATION" in hotspot.primary_indicators:
-                actions.append("Implement suicide prevention protocols")
-                actions.append("Coordinate with emergency services")
+            if "CRISIS" in indicators or "SUICIDAL_IDEATION" in indicators:
+                actions.extend(_CRISIS_ACTIONS)
         
         # Indicator-specific actions
-        if MentalHealthIndicator.ANXIETY in hotspot.primary_indicators:
-            actions.append("Provide anxiety management resources and information")
-        
-        if MentalHealthIndicator.DEPRESSION in hotspot.primary_indicators:
-            actions.append("Increase depression screening and support services")
-        
-        if MentalHealthIndicator.SUBSTANCE_ABUSE in hotspot.primary_indicators:
-            actions.append("Coordinate with substance abuse treatment centers")
+        actions.extend(action for indicator, action in _INDICATOR_ACTIONS if indicator in indicators)
         
         # Trend-based actions
         if hotspot.trend == "INCREASING":
-            actions.append("Monitor trend closely and prepare for escalation")
-            actions.append("Pre-position additional resources")
+            actions.extend(_INCREASING_TREND_ACTIONS)
         
         return actions
     
@@ -173,7 +214,8 @@ class MentalHealthAlertSystem:
         self,
         hotspot: MentalHealthHotspot,
         db_session,
-        resource_ids: Optional[List[str]] = None
+        resource_ids: Optional[List[str]] = None,
+        now: Optional[datetime] = None
     ) -> Alert:
         """
         Create alert in database from hotspot.
@@ -182,6 +224,7 @@ class MentalHealthAlertSystem:
             hotspot: Mental health hotspot
             db_session: Database session
             resource_ids: Optional resource IDs to include in alert
+            now: Optional timestamp for the hotspot update (defaults to now)
             
         Returns:
             Created Alert instance
@@ -220,7 +263,7 @@ class MentalHealthAlertSystem:
         
         # Mark hotspot as having generated alert
         hotspot.alert_generated = True
-        hotspot.updated_at = datetime.now()
+        hotspot.updated_at = now or datetime.now()
         
         api_logger.info(
             f"Created {recommendation.severity.value} alert for hotspot {hotspot.id} "
@@ -239,22 +282,17 @@ class MentalHealthAlertSystem:
         
         In production, this would query from a configuration or database.
         """
-        recipients = []
-        
         # Base recipients
-        recipients.append("mental_health_team@epispy.local")
-        recipients.append("public_health_department@epispy.local")
+        recipients = list(_BASE_RECIPIENTS)
         
         # Severity-specific recipients
         if severity == AlertSeverity.CRITICAL:
-            recipients.append("crisis_response_team@epispy.local")
-            recipients.append("emergency_services@epispy.local")
-            recipients.append("health_department_director@epispy.local")
+            recipients.extend(_CRITICAL_RECIPIENTS)
         
         # Location-specific recipients (would be looked up in production)
         if hotspot.location:
             # In production, would query location-specific contacts
-            recipients.append(f"health_dept_{hotspot.location.name.lower().replace(' ', '_')}@epispy.local")
+            recipients.append(_location_recipient(hotspot.location.name))
         
         return recipients
 
@@ -279,20 +317,31 @@ async def process_hotspots_for_alerts(
         alert_system = MentalHealthAlertSystem()
     
     created_alerts = []
+    now = datetime.now()
     
+    # Build all alerts in the session first (no database round-trips)
     for hotspot in hotspots:
         # Check if hotspot is active and hasn't already generated alert
         if not hotspot.is_active or hotspot.alert_generated:
             continue
         
         try:
-            alert = await alert_system.create_alert_from_hotspot(hotspot, db_session)
+            alert = await alert_system.create_alert_from_hotspot(hotspot, db_session, now=now)
             if alert:
                 created_alerts.append(alert)
-                await db_session.commit()
         except Exception as e:
             api_logger.error(f"Failed to create alert for hotspot {hotspot.id}: {str(e)}")
-            await db_session.rollback()
+    
+    if not created_alerts:
+        return created_alerts
+    
+    # Persist every alert (and the hotspot flags) in a single commit
+    try:
+        await db_session.commit()
+    except Exception as e:
+        api_logger.error(f"Failed to commit {len(created_alerts)} hotspot alerts: {str(e)}")
+        await db_session.rollback()
+        return []
     
     return created_alerts
 
@@ -301,7 +350,8 @@ async def update_hotspot_status(
     hotspot_id: str,
     db_session,
     is_active: bool = False,
-    deactivation_reason: Optional[str] = None
+    deactivation_reason: Optional[str] = None,
+    now: Optional[datetime] = None
 ) -> bool:
     """
     Update hotspot status (activate/deactivate).
@@ -311,6 +361,7 @@ async def update_hotspot_status(
         db_session: Database session
         is_active: New active status
         deactivation_reason: Optional reason for deactivation
+        now: Optional timestamp for the update, so batch callers can share one
         
     Returns:
         True if successful
@@ -327,15 +378,16 @@ async def update_hotspot_status(
             return False
         
         hotspot.is_active = is_active
+        now = now or datetime.now()
         
         if not is_active:
-            hotspot.deactivated_date = datetime.now()
+            hotspot.deactivated_date = now
             if deactivation_reason:
                 if hotspot.metadata_json is None:
                     hotspot.metadata_json = {}
                 hotspot.metadata_json["deactivation_reason"] = deactivation_reason
         
-        hotspot.updated_at = datetime.now()
+        hotspot.updated_at = now
         await db_session.commit()
         
         api_logger.info(f"Updated hotspot {hotspot_id} status to active={is_active}")
@@ -5,15 +5,36 @@ This module provides specialized anonymization functions for mental health
 data to ensure HIPAA/GDPR compliance and prevent re-identification while
 maintaining data utility for surveillance purposes.
 """
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 from datetime import datetime, timedelta
 import hashlib
 import re
-import json
+import threading
 from collections import Counter
+from functools import lru_cache
+
+import numpy as np
 
 from ..utils.logger import api_logger
 
+try:
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    HYPERSCAN_AVAILABLE = False
+
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 
 # Mental health keywords that should be preserved (anonymized)
 MENTAL_HEALTH_KEYWORDS = {
@@ -22,6 +43,34 @@ MENTAL_HEALTH_KEYWORDS = {
     "overwhelmed", "hopeless", "helpless", "numb", "angry", "irritable"
 }
 
+# Precomputed views of MENTAL_HEALTH_KEYWORDS for the keyword scanners
+_MH_KEYWORDS_FROZEN = frozenset(MENTAL_HEALTH_KEYWORDS)
+_MH_KEYWORDS_LOWER = tuple((keyword, keyword.lower()) for keyword in MENTAL_HEALTH_KEYWORDS)
+
+# Age groups used by _generalize_age; a group starts at each break
+_AGE_BREAKS = np.array([13, 18, 25, 35, 45, 55, 65], dtype=np.float64)
+_AGE_LABELS = np.array(["0-12", "13-17", "18-24", "25-34", "35-44", "45-54", "55-64", "65+"])
+
+
+def _age_buckets_py(ages: np.ndarray) -> np.ndarray:
+    """Age group index for each age (same thresholds as _generalize_age)."""
+    out = np.empty(ages.shape[0], np.int8)
+    for i in range(ages.shape[0]):
+        a = ages[i]
+        out[i] = (
+            0 if a < 13 else 1 if a < 18 else 2 if a < 25 else 3 if a < 35
+            else 4 if a < 45 else 5 if a < 55 else 6 if a < 65 else 7
+        )
+    return out
+
+
+# Compiled to native code when numba is installed (optional dependency);
+# otherwise a binary search over the breaks gives the same indices
+_age_buckets = (
+    njit(cache=True)(_age_buckets_py) if NUMBA_AVAILABLE
+    else lambda ages: np.searchsorted(_AGE_BREAKS, ages, side="right")
+)
+
 # PII patterns to detect and remove/anonymize
 PII_PATTERNS = {
     "phone": r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b',
@@ -30,6 +79,51 @@ PII_PATTERNS = {
     "name": r'\b(?:Mr|Mrs|Ms|Dr)\.?\s+[A-Z][a-z]+\s+[A-Z][a-z]+\b'
 }
 
+# Simple full-name heuristic applied after the PII patterns
+NAME_PATTERN = r'\b[A-Z][a-z]+ [A-Z][a-z]+\b'
+
+# All PII patterns as one alternation; the matching group names the pattern
+_PII_UNION = re.compile("|".join(f"(?P<{name}>{pattern})" for name, pattern in PII_PATTERNS.items()))
+_PII_UNION_NOCASE = re.compile(_PII_UNION.pattern, re.IGNORECASE)
+_NAME_RE = re.compile(NAME_PATTERN)
+
+# Any PII_PATTERNS match needs a digit, an '@' or a title (Mr/Mrs/Ms/Dr)
+_DIGIT_RE = re.compile(r'\d')
+_PII_TITLES = ("Mr", "Ms", "Dr")
+
+# Metadata keys containing any of these substrings are dropped
+_PII_KEY_RE = re.compile(r'name|email|phone|address|id|identifier', re.IGNORECASE)
+
+# Hyperscan pattern ids index this list: PII_PATTERNS in order, then NAME_PATTERN
+_PII_EXPRESSIONS = list(PII_PATTERNS.values()) + [NAME_PATTERN]
+
+
+def _build_pii_database():
+    """Compile all PII patterns into one Hyperscan block-mode database."""
+    expressions = [p.encode() for p in _PII_EXPRESSIONS]
+    database = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+    database.compile(
+        expressions=expressions,
+        ids=list(range(len(expressions))),
+        elements=len(expressions),
+        flags=hyperscan.HS_FLAG_SOM_LEFTMOST,
+    )
+    return database
+
+
+_PII_DATABASE = _build_pii_database() if HYPERSCAN_AVAILABLE else None
+_hyperscan_local = threading.local()
+
+
+@lru_cache(maxsize=8)
+def _keyword_automaton(keywords: frozenset):
+    """Build (once per keyword set) an Aho-Corasick automaton over lowercased keywords."""
+    automaton = ahocorasick.Automaton()
+    for keyword in keywords:
+        automaton.add_word(keyword.lower(), keyword)
+    automaton.make_automaton()
+    return automaton
+
 
 def anonymize_counseling_session(session_data: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -48,25 +142,17 @@ def anonymize_counseling_session(session_data: Dict[str, Any]) -> Dict[str, Any]
     # Hash session ID if present
     if "session_id" in session_data:
         session_id = str(session_data["session_id"])
-        anonymized["session_id_hash"] = hashlib.sha256(session_id.encode()).hexdigest()[:16]
-    
-    # Remove all PII fields
-    pii_fields = [
-        "patient_id", "patient_name", "name", "first_name", "last_name",
-        "email", "phone", "address", "zip_code", "ssn", "national_id",
-        "insurance_number", "medical_record_number"
-    ]
+        anonymized["session_id_hash"] = _hash_id(session_id)
     
-    for field in pii_fields:
-        if field in session_data:
-            del session_data[field]
+    # PII fields (patient_id, names, contact details, ssn, insurance and
+    # record numbers) are never copied: only the fields below are read, and
+    # the caller's dict is left untouched
     
     # Generalize age to age group
     if "age" in session_data:
         age = session_data.get("age")
         if isinstance(age, (int, float)):
             anonymized["age_group"] = _generalize_age(age)
-        del session_data["age"]
     elif "age_group" in session_data:
         anonymized["age_group"] = session_data["age_group"]
     
@@ -78,7 +164,6 @@ def anonymize_counseling_session(session_data: Dict[str, Any]) -> Dict[str, Any]
             anonymized["gender_group"] = "M" if gender in ["M", "MALE"] else "F"
         else:
             anonymized["gender_group"] = "UNKNOWN"
-        del session_data["gender"]
     elif "gender_group" in session_data:
         anonymized["gender_group"] = session_data["gender_group"]
     else:
@@ -89,7 +174,6 @@ def anonymize_counseling_session(session_data: Dict[str, Any]) -> Dict[str, Any]
         location = session_data["location"]
         # Extract only city/region level
         anonymized["location_generalized"] = _generalize_location(location)
-        del session_data["location"]
     
     if "location_id" in session_data:
         anonymized["location_id"] = session_data["location_id"]
@@ -106,7 +190,6 @@ def anonymize_counseling_session(session_data: Dict[str, Any]) -> Dict[str, Any]
             session_data["notes"],
             preserve_keywords=MENTAL_HEALTH_KEYWORDS
         )
-        del session_data["notes"]
     elif "anonymized_notes_summary" in session_data:
         anonymized["anonymized_notes_summary"] = session_data["anonymized_notes_summary"]
     
@@ -117,6 +200,39 @@ def anonymize_counseling_session(session_data: Dict[str, Any]) -> Dict[str, Any]
     return anonymized
 
 
+def anonymize_counseling_sessions_batch(sessions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Anonymize a batch of counseling sessions.
+    
+    Same output as anonymize_counseling_session per record, but ages are
+    generalized for the whole batch in one vectorized call.
+    
+    Args:
+        sessions: Raw counseling session records
+        
+    Returns:
+        Anonymized session records, in input order
+    """
+    numeric = [
+        i for i, session in enumerate(sessions)
+        if isinstance(session.get("age"), (int, float))
+    ]
+    if not numeric:
+        return [anonymize_counseling_session(session) for session in sessions]
+    
+    ages = np.fromiter((sessions[i]["age"] for i in numeric), dtype=np.float64, count=len(numeric))
+    labels = _AGE_LABELS[_age_buckets(ages)].tolist()
+    
+    # Shallow copies carry the precomputed age group; inputs are not modified
+    prepared = list(sessions)
+    for i, label in zip(numeric, labels):
+        session = {key: value for key, value in sessions[i].items() if key != "age"}
+        session["age_group"] = label
+        prepared[i] = session
+    
+    return [anonymize_counseling_session(session) for session in prepared]
+
+
 def anonymize_hotline_transcript(transcript_data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Anonymize crisis hotline call transcript.
@@ -135,24 +251,17 @@ def anonymize_hotline_transcript(transcript_data: Dict[str, Any]) -> Dict[str, A
     # Hash call ID if present
     if "call_id" in transcript_data:
         call_id = str(transcript_data["call_id"])
-        anonymized["call_id_hash"] = hashlib.sha256(call_id.encode()).hexdigest()[:16]
+        anonymized["call_id_hash"] = _hash_id(call_id)
     
-    # Remove PII
-    pii_fields = [
-        "caller_id", "caller_name", "name", "phone", "email", "address",
-        "caller_location", "caller_address"
-    ]
-    
-    for field in pii_fields:
-        if field in transcript_data:
-            del transcript_data[field]
+    # PII fields (caller id/name/location, contact details) are never
+    # copied: only the fields below are read, and the caller's dict is
+    # left untouched
     
     # Generalize age
     if "age" in transcript_data:
         age = transcript_data.get("age")
         if isinstance(age, (int, float)):
             anonymized["age_group"] = _generalize_age(age)
-        del transcript_data["age"]
     elif "age_group" in transcript_data:
         anonymized["age_group"] = transcript_data["age_group"]
     
@@ -184,8 +293,6 @@ def anonymize_hotline_transcript(transcript_data: Dict[str, Any]) -> Dict[str, A
             transcript_text,
             preserve_keywords=MENTAL_HEALTH_KEYWORDS
         )
-        
-        del transcript_data["transcript"]
     
     # NLP-extracted features (if already processed)
     for field in ["primary_indicators", "crisis_score", "language_patterns",
@@ -218,26 +325,27 @@ def anonymize_social_media_data(social_data: Dict[str, Any]) -> Dict[str, Any]:
         # Aggregate data from posts
         anonymized["sample_size"] = len(posts)
         
-        # Calculate aggregated metrics
-        sentiment_scores = [p.get("sentiment_score", 0) for p in posts if "sentiment_score" in p]
-        if sentiment_scores:
-            anonymized["sentiment_score"] = sum(sentiment_scores) / len(sentiment_scores)
-        
-        # Count mental health keywords (aggregated)
-        all_keywords = []
+        # Single pass over posts: sentiment sum and keyword counts (aggregated)
+        sentiment_sum = 0.0
+        sentiment_count = 0
+        keyword_counts = Counter()
         for post in posts:
+            if "sentiment_score" in post:
+                sentiment_sum += post["sentiment_score"]
+                sentiment_count += 1
             if "keywords" in post:
-                all_keywords.extend(post["keywords"])
+                keyword_counts.update(post["keywords"])
+        
+        if sentiment_count:
+            anonymized["sentiment_score"] = sentiment_sum / sentiment_count
         
-        keyword_counts = Counter(all_keywords)
-        anonymized["mental_health_keyword_frequency"] = len(all_keywords) / len(posts) if posts else 0
+        total_keywords = sum(keyword_counts.values())
+        anonymized["mental_health_keyword_frequency"] = total_keywords / len(posts) if posts else 0
         anonymized["anxiety_mentions"] = keyword_counts.get("anxiety", 0) + keyword_counts.get("panic", 0)
         anonymized["depression_mentions"] = keyword_counts.get("depression", 0) + keyword_counts.get("hopeless", 0)
         anonymized["crisis_keywords"] = sum(
             keyword_counts.get(kw, 0) for kw in ["crisis", "suicide", "self-harm", "emergency"]
         )
-        
-        del social_data["posts"]
     
     # Preserve location (generalized)
     if "location_id" in social_data:
@@ -290,8 +398,6 @@ def anonymize_school_absenteeism(absenteeism_data: Dict[str, Any]) -> Dict[str,
             anonymized["chronic_absenteeism_rate"] = (chronic / anonymized["total_enrollment"]) * 100
         else:
             anonymized["chronic_absenteeism_rate"] = 0.0
-        
-        del absenteeism_data["students"]
     
     # Preserve aggregated fields
     for field in ["date", "location_id", "school_type"]:
@@ -336,32 +442,106 @@ def _anonymize_text(text: str, preserve_keywords: Optional[set] = None) -> str:
     if not text:
         return ""
     
+    # Prefilter with Hyperscan so re.sub only runs for patterns present in
+    # the text. Its \b is byte-based, so non-ASCII text skips the prefilter.
+    if _PII_DATABASE is not None and text.isascii():
+        matched = _matched_pattern_ids(text)
+        if not matched:
+            return text
+    else:
+        matched = None
+    
     anonymized = text
     
     # Remove PII patterns
-    for pattern_name, pattern in PII_PATTERNS.items():
-        anonymized = re.sub(pattern, f"[{pattern_name}_REDACTED]", anonymized)
+    if matched is None:
+        run_pii = _may_contain_pii(text)
+    else:
+        run_pii = not matched.isdisjoint(range(len(PII_PATTERNS)))
+    if run_pii:
+        anonymized = _PII_UNION.sub(_redact_pii_match, anonymized)
     
     # Remove names (if not already removed)
     # This is a simple heuristic - in production, use NER
-    anonymized = re.sub(r'\b[A-Z][a-z]+ [A-Z][a-z]+\b', '[NAME_REDACTED]', anonymized)
+    if matched is None or len(PII_PATTERNS) in matched:
+        anonymized = _NAME_RE.sub('[NAME_REDACTED]', anonymized)
     
     return anonymized
 
 
+def _hash_id(value: str) -> str:
+    """
+    Truncated SHA-256 of an identifier (16 hex chars).
+    
+    Hex-encodes only the 8 bytes kept, giving the same value as
+    sha256(...).hexdigest()[:16].
+    """
+    return hashlib.sha256(value.encode()).digest()[:8].hex()
+
+
+def _hash_ids(values: List[str]) -> List[str]:
+    """Hash a batch of identifiers with _hash_id."""
+    sha256 = hashlib.sha256
+    return [sha256(value.encode()).digest()[:8].hex() for value in values]
+
+
+def _may_contain_pii(text: str) -> bool:
+    """
+    Cheap check whether any PII_PATTERNS could match text.
+    
+    A few substring scans rule out prose with no digits, '@' or titles,
+    so the union regex is skipped for it.
+    """
+    return (
+        "@" in text
+        or any(title in text for title in _PII_TITLES)
+        or _DIGIT_RE.search(text) is not None
+    )
+
+
+def _redact_pii_match(match: re.Match) -> str:
+    """Replacement token for a _PII_UNION match."""
+    return f"[{match.lastgroup}_REDACTED]"
+
+
+def _matched_pattern_ids(text: str) -> set:
+    """
+    Return ids of the PII patterns that occur in ASCII text.
+    
+    One Hyperscan pass over all patterns; ids follow PII_PATTERNS order,
+    with NAME_PATTERN last.
+    """
+    scratch = getattr(_hyperscan_local, "scratch", None)
+    if scratch is None:
+        scratch = _hyperscan_local.scratch = hyperscan.Scratch(_PII_DATABASE)
+    
+    matched = set()
+    
+    def on_match(pattern_id, start, end, flags, context):
+        matched.add(pattern_id)
+        # Non-zero return stops the scan once every pattern has been seen
+        return len(matched) == len(_PII_EXPRESSIONS)
+    
+    try:
+        _PII_DATABASE.scan(text.encode(), match_event_handler=on_match, scratch=scratch)
+    except hyperscan.ScanTerminated:
+        pass
+    return matched
+
+
 def _extract_anonymized_keywords(text: str, keyword_set: set) -> List[str]:
     """Extract mental health keywords from text (anonymized)."""
     if not text:
         return []
     
     text_lower = text.lower()
-    found_keywords = []
     
-    for keyword in keyword_set:
-        if keyword.lower() in text_lower:
-            found_keywords.append(keyword)
+    if AHOCORASICK_AVAILABLE:
+        automaton = _keyword_automaton(frozenset(keyword_set))
+        return list({keyword for _, keyword in automaton.iter(text_lower)})
     
-    return list(set(found_keywords))  # Remove duplicates
+    # keyword_set is already unique, so no de-duplication pass is needed
+    return [keyword for keyword in keyword_set if keyword.lower() in text_lower]
 
 
 def _extract_themes(text: str) -> str:
@@ -371,12 +551,18 @@ def _extract_themes(text: str) -> str:
     
     # Count mental health keywords
     text_lower = text.lower()
-    theme_counts = {}
     
-    for keyword in MENTAL_HEALTH_KEYWORDS:
-        count = text_lower.count(keyword.lower())
-        if count > 0:
-            theme_counts[keyword] = count
+    if AHOCORASICK_AVAILABLE:
+        # One automaton pass counts every keyword occurrence
+        automaton = _keyword_automaton(_MH_KEYWORDS_FROZEN)
+        theme_counts = Counter(keyword for _, keyword in automaton.iter(text_lower))
+    else:
+        theme_counts = {}
+        
+        for keyword, keyword_lower in _MH_KEYWORDS_LOWER:
+            count = text_lower.count(keyword_lower)
+            if count > 0:
+                theme_counts[keyword] = count
     
     # Create thematic summary
     if theme_counts:
@@ -387,17 +573,22 @@ def _extract_themes(text: str) -> str:
     return "General mental health discussion"
 
 
+@lru_cache(maxsize=1024)
+def _is_pii_key(key: str) -> bool:
+    """Whether a metadata key name looks like it holds PII."""
+    return _PII_KEY_RE.search(key) is not None
+
+
 def _sanitize_metadata(metadata: Any) -> Dict[str, Any]:
     """Sanitize metadata to remove PII."""
     if not isinstance(metadata, dict):
         return {}
     
     sanitized = {}
-    pii_keys = ["name", "email", "phone", "address", "id", "identifier"]
     
     for key, value in metadata.items():
         # Skip PII keys
-        if any(pii_key in key.lower() for pii_key in pii_keys):
+        if _is_pii_key(key):
             continue
         
         # Recursively sanitize nested dicts
@@ -414,6 +605,27 @@ def _sanitize_metadata(metadata: Any) -> Dict[str, Any]:
     return sanitized
 
 
+def _iter_text_leaves(value: Any, path: str = "$") -> Iterator[Tuple[str, str]]:
+    """
+    Yield (path, text) for every key and scalar leaf of a nested structure.
+    
+    Non-string scalars are stringified the way json.dumps(default=str) would;
+    booleans and None can't hold PII and are skipped.
+    """
+    if isinstance(value, dict):
+        for key, item in value.items():
+            item_path = f"{path}.{key}"
+            yield item_path, str(key)
+            yield from _iter_text_leaves(item, item_path)
+    elif isinstance(value, (list, tuple)):
+        for index, item in enumerate(value):
+            yield from _iter_text_leaves(item, f"{path}[{index}]")
+    elif isinstance(value, str):
+        yield path, value
+    elif value is not None and not isinstance(value, bool):
+        yield path, str(value)
+
+
 def validate_anonymization(data: Dict[str, Any]) -> bool:
     """
     Validate that data is properly anonymized.
@@ -426,20 +638,19 @@ def validate_anonymization(data: Dict[str, Any]) -> bool:
     Returns:
         True if data appears properly anonymized
     """
-    data_str = json.dumps(data, default=str).lower()
-    
-    # Check for PII patterns
-    for pattern_name, pattern in PII_PATTERNS.items():
-        matches = re.findall(pattern, data_str, re.IGNORECASE)
-        if matches:
-            api_logger.warning(f"Potential PII detected: {pattern_name} - {len(matches)} matches")
+    # Walk the structure and stop at the first suspicious leaf
+    for path, text in _iter_text_leaves(data):
+        text = text.lower()
+        
+        # Check for PII patterns
+        match = _PII_UNION_NOCASE.search(text)
+        if match:
+            api_logger.warning(f"Potential PII detected: {match.lastgroup} at {path}")
+            return False
+        
+        # Check for common name patterns
+        if _NAME_RE.search(text):
+            api_logger.warning(f"Potential name pattern detected at {path}")
             return False
-    
-    # Check for common name patterns
-    name_pattern = r'\b[A-Z][a-z]+ [A-Z][a-z]+\b'
-    if re.search(name_pattern, data_str):
-        api_logger.warning("Potential name pattern detected")
-        return False
     
     return True
-
@@ -5,22 +5,149 @@ This module provides algorithms for detecting clusters of anxiety/depression
 in geographic regions using spatial analysis techniques.
 """
 from typing import Dict, Any, List, Tuple, Optional
-from datetime import datetime, timedelta
+from datetime import datetime
 import numpy as np
 from dataclasses import dataclass
+from itertools import chain
+from operator import itemgetter
+from math import radians, degrees, cos, sin, asin, sqrt
+import uuid
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from ..utils.logger import api_logger
-from .models import MentalHealthIndicator, MentalHealthSeverity
+from .models import MentalHealthSeverity, MentalHealthHotspot
 
 # Try to import scikit-learn for clustering
 try:
     from sklearn.cluster import DBSCAN
-    from sklearn.preprocessing import StandardScaler
+    from sklearn.neighbors import BallTree
+    from scipy.sparse import csr_matrix
     SKLEARN_AVAILABLE = True
 except ImportError:
     SKLEARN_AVAILABLE = False
     api_logger.warning("scikit-learn not available, using simplified clustering")
 
+# Parallel (multi-threaded C++) DBSCAN, used instead of the simplified
+# clustering when sklearn is unavailable
+try:
+    from dbscan import DBSCAN as ParallelDBSCAN
+    PARALLEL_DBSCAN_AVAILABLE = True
+except ImportError:
+    PARALLEL_DBSCAN_AVAILABLE = False
+
+# Rows per block when computing pairwise distances without a KD-tree
+_PAIRWISE_BLOCK_ROWS = 1024
+
+_DEGREES_PER_RADIAN = degrees(1.0)
+
+# Hotspot score thresholds and the severity at or above each of them
+_SEVERITY_THRESHOLDS = np.array([4.0, 6.0, 8.0])
+_SEVERITY_LEVELS = np.array([
+    MentalHealthSeverity.MILD,
+    MentalHealthSeverity.MODERATE,
+    MentalHealthSeverity.SEVERE,
+    MentalHealthSeverity.CRITICAL
+], dtype=object)
+
+# SciPy's KD-tree speeds up neighbor search in the simplified clustering
+try:
+    from scipy.spatial import cKDTree
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+# Numba compiles the neighbor search and cluster expansion to native code
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, inline='always')
+    def _haversine_angle(lat1, lon1, lat2, lon2):
+        """Great-circle angle (radians) between two points given in radians."""
+        a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+        return 2 * np.arcsin(np.sqrt(min(max(a, 0.0), 1.0)))
+    
+    @njit(cache=True, parallel=True)
+    def _neighbor_graph_kernel(coords_rad, eps_rad):
+        """Brute-force CSR neighbor graph (self excluded), rows scanned in parallel."""
+        n = coords_rad.shape[0]
+        counts = np.zeros(n, np.int64)
+        for i in prange(n):
+            count = 0
+            for j in range(n):
+                if j != i and _haversine_angle(
+                    coords_rad[i, 0], coords_rad[i, 1], coords_rad[j, 0], coords_rad[j, 1]
+                ) <= eps_rad:
+                    count += 1
+            counts[i] = count
+        
+        indptr = np.zeros(n + 1, np.int64)
+        indptr[1:] = np.cumsum(counts)
+        indices = np.empty(indptr[n], np.int64)
+        for i in prange(n):
+            k = indptr[i]
+            for j in range(n):
+                if j != i and _haversine_angle(
+                    coords_rad[i, 0], coords_rad[i, 1], coords_rad[j, 0], coords_rad[j, 1]
+                ) <= eps_rad:
+                    indices[k] = j
+                    k += 1
+        return indptr, indices
+    
+    @njit(cache=True)
+    def _expand_clusters_kernel(indptr, indices, min_samples):
+        """Cluster expansion of _simple_clustering over a CSR neighbor graph."""
+        n = indptr.shape[0] - 1
+        labels = np.full(n, -1, np.int64)
+        visited = np.zeros(n, np.bool_)
+        in_cluster = np.zeros(n, np.bool_)
+        cluster = np.empty(n, np.int64)
+        cluster_id = 0
+        
+        for i in range(n):
+            if visited[i]:
+                continue
+            visited[i] = True
+            
+            if indptr[i + 1] - indptr[i] < min_samples - 1:
+                continue
+            
+            labels[i] = cluster_id
+            size = 0
+            cluster[size] = i
+            size += 1
+            in_cluster[i] = True
+            for k in range(indptr[i], indptr[i + 1]):
+                cluster[size] = indices[k]
+                size += 1
+                in_cluster[indices[k]] = True
+            
+            j = 0
+            while j < size:
+                point = cluster[j]
+                if not visited[point]:
+                    visited[point] = True
+                    for k in range(indptr[point], indptr[point + 1]):
+                        neighbor = indices[k]
+                        if not in_cluster[neighbor]:
+                            in_cluster[neighbor] = True
+                            cluster[size] = neighbor
+                            size += 1
+                        if labels[neighbor] == -1:
+                            labels[neighbor] = cluster_id
+                j += 1
+            
+            for k in range(size):
+                in_cluster[cluster[k]] = False
+            cluster_id += 1
+        
+        return labels
+
 
 @dataclass
 class Hotspot:
@@ -37,6 +164,144 @@ class Hotspot:
     contributing_factors: Dict[str, Any]
 
 
+@dataclass
+class HotspotBatch:
+    """
+    Column-oriented view of many hotspots.
+    
+    Numeric fields are NumPy arrays and the rest are object arrays, so
+    scoring and filtering run as array operations instead of per-record
+    attribute lookups. Use as_records() to get Hotspot objects back.
+    """
+    location_id: np.ndarray
+    latitude: np.ndarray
+    longitude: np.ndarray
+    hotspot_score: np.ndarray
+    primary_indicators: np.ndarray
+    affected_population_estimate: np.ndarray
+    severity: np.ndarray
+    detected_date: np.ndarray
+    trend: np.ndarray
+    contributing_factors: np.ndarray
+    
+    @classmethod
+    def from_hotspots(cls, hotspots: List[Hotspot]) -> "HotspotBatch":
+        """Build a batch from a list of hotspots, preserving their order."""
+        n = len(hotspots)
+        return cls(
+            location_id=_object_column([h.location_id for h in hotspots]),
+            latitude=np.fromiter((h.latitude for h in hotspots), dtype=np.float64, count=n),
+            longitude=np.fromiter((h.longitude for h in hotspots), dtype=np.float64, count=n),
+            hotspot_score=np.fromiter((h.hotspot_score for h in hotspots), dtype=np.float64, count=n),
+            primary_indicators=_object_column([h.primary_indicators for h in hotspots]),
+            affected_population_estimate=np.fromiter(
+                (h.affected_population_estimate for h in hotspots), dtype=np.int64, count=n
+            ),
+            severity=_object_column([h.severity for h in hotspots]),
+            detected_date=_object_column([h.detected_date for h in hotspots]),
+            trend=_object_column([h.trend for h in hotspots]),
+            contributing_factors=_object_column([h.contributing_factors for h in hotspots])
+        )
+    
+    def __len__(self) -> int:
+        return len(self.hotspot_score)
+    
+    def select(self, mask: np.ndarray) -> "HotspotBatch":
+        """Return the hotspots selected by a boolean mask or index array."""
+        return HotspotBatch(**{name: column[mask] for name, column in vars(self).items()})
+    
+    def filter_by_score(self, threshold: float) -> "HotspotBatch":
+        """Return the hotspots whose score is at least threshold."""
+        return self.select(self.hotspot_score >= threshold)
+    
+    def as_records(self) -> List[Hotspot]:
+        """Convert the batch back into a list of Hotspot objects."""
+        return [
+            Hotspot(*fields)
+            for fields in zip(
+                self.location_id.tolist(),
+                self.latitude.tolist(),
+                self.longitude.tolist(),
+                self.hotspot_score.tolist(),
+                self.primary_indicators.tolist(),
+                self.affected_population_estimate.tolist(),
+                self.severity.tolist(),
+                self.detected_date.tolist(),
+                self.trend.tolist(),
+                self.contributing_factors.tolist()
+            )
+        ]
+
+
+def _object_column(values: List[Any]) -> np.ndarray:
+    """1-D object array holding values as-is (lists are not expanded)."""
+    column = np.empty(len(values), dtype=object)
+    for i, value in enumerate(values):
+        column[i] = value
+    return column
+
+
+async def bulk_persist_hotspots(
+    session: AsyncSession,
+    hotspots: List[Hotspot],
+    detected_date: Optional[datetime] = None
+) -> List[MentalHealthHotspot]:
+    """
+    Insert detected hotspots as new active rows in one batched statement.
+    
+    Ids are assigned client-side for the whole batch. Hotspots sharing a
+    location are stored as one row: the first supplies the row and later
+    ones update its score, severity and indicators, as they would update an
+    existing active hotspot. The caller owns the transaction; nothing is
+    committed here.
+    
+    Args:
+        session: Database session
+        hotspots: Hotspots to persist
+        detected_date: Detection timestamp for every row (defaults to now)
+        
+    Returns:
+        Created MentalHealthHotspot records, one per hotspot in the order of
+        hotspots (hotspots sharing a location share a record)
+    """
+    if not hotspots:
+        return []
+    
+    detected_date = detected_date or datetime.now()
+    
+    rows = {}  # location_id -> row to insert
+    for hotspot in hotspots:
+        row = rows.get(hotspot.location_id)
+        if row is None:
+            rows[hotspot.location_id] = {
+                "id": uuid.uuid4(),
+                "location_id": uuid.UUID(hotspot.location_id),
+                "detected_date": detected_date,
+                "hotspot_score": hotspot.hotspot_score,
+                "primary_indicators": hotspot.primary_indicators,
+                "contributing_factors": hotspot.contributing_factors,
+                "severity": hotspot.severity,
+                "affected_population_estimate": hotspot.affected_population_estimate,
+                "trend": hotspot.trend,
+                "is_active": True
+            }
+        else:
+            row.update(
+                hotspot_score=hotspot.hotspot_score,
+                severity=hotspot.severity,
+                primary_indicators=hotspot.primary_indicators
+            )
+    
+    result = await session.scalars(
+        insert(MentalHealthHotspot).returning(
+            MentalHealthHotspot, sort_by_parameter_order=True
+        ),
+        list(rows.values())
+    )
+    created = dict(zip(rows, result.all()))
+    return [created[hotspot.location_id] for hotspot in hotspots]
+
+
 def detect_hotspots(
     data_points: List[Dict[str, Any]],
     location_coordinates: Dict[str, Tuple[float, float]],
@@ -62,24 +327,29 @@ def detect_hotspots(
         return []
     
     # Prepare data for clustering
-    coordinates = []
-    location_ids = []
-    indicators_list = []
-    crisis_scores = []
-    
-    for point in data_points:
-        location_id = point.get("location_id")
-        if location_id in location_coordinates:
-            lat, lon = location_coordinates[location_id]
-            coordinates.append([lat, lon])
-            location_ids.append(location_id)
-            indicators_list.append(point.get("primary_indicators", []))
-            crisis_scores.append(point.get("crisis_score", 0.0))
-    
-    if len(coordinates) < min_samples:
+    valid_points = [
+        point for point in data_points
+        if point.get("location_id") in location_coordinates
+    ]
+    n_points = len(valid_points)
+    
+    if n_points < min_samples:
         return []
     
-    coordinates = np.array(coordinates)
+    # np.fromiter writes straight into the final buffers
+    coordinates = np.fromiter(
+        chain.from_iterable(
+            location_coordinates[point["location_id"]] for point in valid_points
+        ),
+        dtype=np.float64,
+        count=2 * n_points
+    ).reshape(n_points, 2)
+    crisis_scores = np.fromiter(
+        (point.get("crisis_score", 0.0) for point in valid_points),
+        dtype=np.float64,
+        count=n_points
+    )
+    indicators_list = [point.get("primary_indicators", []) for point in valid_points]
     
     # Convert eps from km to degrees (approximate)
     # 1 degree latitude ≈ 111 km, longitude varies by latitude
@@ -87,90 +357,103 @@ def detect_hotspots(
     
     if SKLEARN_AVAILABLE:
         # Use DBSCAN clustering
-        dbscan = DBSCAN(eps=eps_degrees, min_samples=min_samples, metric='haversine')
-        
-        # Scale coordinates for better clustering
-        scaler = StandardScaler()
-        coords_scaled = scaler.fit_transform(coordinates)
-        
-        # For haversine distance, we need (lat, lon) in radians
-        # Use simple euclidean distance for simplicity
-        from sklearn.metrics.pairwise import haversine_distances
-        from math import radians
-        
-        coords_rad = np.radians(coordinates)
-        labels = dbscan.fit_predict(coords_rad)
+        labels = _dbscan_haversine(np.radians(coordinates), eps_degrees, min_samples)
+    elif PARALLEL_DBSCAN_AVAILABLE:
+        # The parallel implementation is Euclidean-only: cluster unit vectors
+        # with the chord length of the same haversine eps sklearn is given
+        labels, _ = ParallelDBSCAN(
+            _unit_vectors(np.radians(coordinates)),
+            eps=_chord_length(eps_degrees),
+            min_samples=min_samples
+        )
     else:
         # Simple distance-based clustering
         labels = _simple_clustering(coordinates, eps_degrees, min_samples)
     
-    # Extract clusters
-    unique_labels = set(labels)
-    if -1 in unique_labels:
-        unique_labels.remove(-1)  # Remove noise points
+    # Group clustered points in one pass (noise is labelled -1)
+    labels = np.asarray(labels)
+    clustered = labels >= 0
+    cluster_labels, inverse, counts = np.unique(
+        labels[clustered], return_inverse=True, return_counts=True
+    )
+    n_clusters = len(cluster_labels)
+    
+    centers = np.zeros((n_clusters, 2))
+    np.add.at(centers, inverse, coordinates[clustered])
+    centers /= counts[:, None]
+    
+    score_sums = np.zeros(n_clusters)
+    np.add.at(score_sums, inverse, crisis_scores[clustered])
+    mean_scores = score_sums / counts
+    hotspot_scores = np.fmin(10.0, mean_scores)
+    severities = _SEVERITY_LEVELS[
+        np.searchsorted(_SEVERITY_THRESHOLDS, hotspot_scores, side="right")
+    ]
+    
+    # Encode indicators once and count them in a (clusters, kinds) table;
+    # members are flattened in point order so first sightings break ties.
+    # Kinds are keyed by enum value so MentalHealthIndicator members and
+    # plain strings share a code, and each kind is reported as first seen
+    member_indicators = [indicators_list[idx] for idx in np.flatnonzero(clustered)]
+    owners = np.repeat(inverse, [len(indicators) for indicators in member_indicators])
+    kind_index = {}
+    indicator_names = []
+    member_codes = []
+    for indicator in chain.from_iterable(member_indicators):
+        code = kind_index.setdefault(getattr(indicator, "value", indicator), len(kind_index))
+        if code == len(indicator_names):
+            indicator_names.append(indicator)
+        member_codes.append(code)
+    codes = np.asarray(member_codes, dtype=np.intp)
+    indicator_counts = np.zeros((n_clusters, len(indicator_names)), dtype=np.int32)
+    np.add.at(indicator_counts, (owners, codes), 1)
+    first_seen = np.full(indicator_counts.shape, len(codes))
+    np.minimum.at(first_seen, (owners, codes), np.arange(len(codes)))
     
     hotspots = []
     
-    for cluster_id in unique_labels:
-        cluster_points = [i for i, label in enumerate(labels) if label == cluster_id]
+    # Built once and reused for every cluster center
+    location_index = _build_location_index(location_coordinates)
+    
+    for cluster in range(n_clusters):
+        cluster_size = int(counts[cluster])
         
-        if len(cluster_points) < min_samples:
+        if cluster_size < min_samples:
             continue
         
-        # Calculate cluster center
-        cluster_coords = coordinates[cluster_points]
-        center_lat = np.mean(cluster_coords[:, 0])
-        center_lon = np.mean(cluster_coords[:, 1])
-        
-        # Aggregate indicators and scores
-        cluster_indicators = []
-        cluster_scores = []
+        center_lat, center_lon = centers[cluster]
         
-        for idx in cluster_points:
-            cluster_indicators.extend(indicators_list[idx])
-            cluster_scores.append(crisis_scores[idx])
-        
-        # Calculate hotspot score
-        hotspot_score = np.mean(cluster_scores) if cluster_scores else 0.0
-        hotspot_score = min(10.0, hotspot_score)
-        
-        # Determine severity
-        if hotspot_score >= 8.0:
-            severity = MentalHealthSeverity.CRITICAL
-        elif hotspot_score >= 6.0:
-            severity = MentalHealthSeverity.SEVERE
-        elif hotspot_score >= 4.0:
-            severity = MentalHealthSeverity.MODERATE
-        else:
-            severity = MentalHealthSeverity.MILD
-        
-        # Get most common indicators
-        from collections import Counter
-        indicator_counts = Counter(cluster_indicators)
-        primary_indicators = [ind for ind, _ in indicator_counts.most_common(3)]
+        # Get most common indicators (ties keep first-seen order)
+        present = np.flatnonzero(indicator_counts[cluster])
+        present = present[np.argsort(first_seen[cluster, present])]
+        ranked = present[np.argsort(-indicator_counts[cluster, present], kind="stable")]
+        primary_indicators = [indicator_names[kind] for kind in ranked[:3]]
+        indicator_distribution = {
+            indicator_names[kind]: int(indicator_counts[cluster, kind]) for kind in present
+        }
         
         # Find nearest location_id for cluster center
         nearest_location_id = _find_nearest_location(
-            center_lat, center_lon, location_coordinates
+            center_lat, center_lon, location_coordinates, location_index
         )
         
         # Estimate affected population (simplified)
-        affected_population = len(cluster_points) * 100  # Rough estimate
+        affected_population = cluster_size * 100  # Rough estimate
         
         hotspot = Hotspot(
             location_id=nearest_location_id,
             latitude=center_lat,
             longitude=center_lon,
-            hotspot_score=float(hotspot_score),
+            hotspot_score=float(hotspot_scores[cluster]),
             primary_indicators=primary_indicators,
             affected_population_estimate=affected_population,
-            severity=severity,
+            severity=severities[cluster],
             detected_date=datetime.now(),
             trend="STABLE",  # Would be calculated from historical data
             contributing_factors={
-                "cluster_size": len(cluster_points),
-                "average_crisis_score": float(np.mean(cluster_scores)),
-                "indicator_distribution": dict(indicator_counts)
+                "cluster_size": cluster_size,
+                "average_crisis_score": float(mean_scores[cluster]),
+                "indicator_distribution": indicator_distribution
             }
         )
         
@@ -179,6 +462,49 @@ def detect_hotspots(
     return hotspots
 
 
+def _dbscan_haversine(coords_rad: np.ndarray, eps: float, min_samples: int) -> np.ndarray:
+    """
+    sklearn DBSCAN (haversine metric) over (lat, lon) radians.
+    
+    Data points take their coordinates from their location, so most are
+    exact duplicates. Clustering runs on the unique coordinates weighted by
+    their counts, which gives the same labels as clustering every point:
+    duplicates share a neighborhood, so they are core, border or noise
+    together. Unique coordinates keep the order of their first point,
+    since DBSCAN gives a border point to the first cluster reaching it.
+    Neighborhoods come from a haversine BallTree radius query passed to
+    DBSCAN as a precomputed sparse distance graph.
+    """
+    unique_coords, first_index, inverse, counts = np.unique(
+        coords_rad, axis=0, return_index=True, return_inverse=True, return_counts=True
+    )
+    order = np.argsort(first_index)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    unique_coords = unique_coords[order]
+    counts = counts[order]
+    inverse = rank[inverse.ravel()]
+    
+    tree = BallTree(unique_coords, metric='haversine')
+    # DBSCAN expects each row of a precomputed graph sorted by distance
+    neighbors, distances = tree.query_radius(
+        unique_coords, r=eps, return_distance=True, sort_results=True
+    )
+    
+    n_unique = len(unique_coords)
+    indptr = np.zeros(n_unique + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum([len(row) for row in neighbors])
+    graph = csr_matrix(
+        (np.concatenate(distances), np.concatenate(neighbors), indptr),
+        shape=(n_unique, n_unique)
+    )
+    
+    dbscan = DBSCAN(eps=eps, min_samples=min_samples, metric='precomputed')
+    unique_labels = dbscan.fit_predict(graph, sample_weight=counts)
+    
+    return unique_labels[inverse]
+
+
 def _simple_clustering(
     coordinates: np.ndarray,
     eps: float,
@@ -196,103 +522,249 @@ def _simple_clustering(
         Array of cluster labels (-1 for noise)
     """
     n_points = len(coordinates)
+    
+    # Neighbors of every point (excluding itself), computed once
+    indptr, indices = _neighbor_graph(coordinates, eps)
+    
+    if NUMBA_AVAILABLE:
+        return _expand_clusters_kernel(indptr, indices, min_samples)
+    
     labels = np.full(n_points, -1)  # -1 means noise
     cluster_id = 0
     
-    visited = set()
+    visited = np.zeros(n_points, dtype=bool)
+    in_cluster = np.zeros(n_points, dtype=bool)
     
     for i in range(n_points):
-        if i in visited:
+        if visited[i]:
             continue
         
-        visited.add(i)
+        visited[i] = True
         
         # Find neighbors
-        neighbors = []
-        for j in range(n_points):
-            if i != j:
-                dist = _haversine_distance(
-                    coordinates[i][0], coordinates[i][1],
-                    coordinates[j][0], coordinates[j][1]
-                )
-                if dist <= eps:
-                    neighbors.append(j)
+        neighbors = indices[indptr[i]:indptr[i + 1]].tolist()
         
         if len(neighbors) >= min_samples - 1:  # -1 because we include point i
             # Start new cluster
             labels[i] = cluster_id
             cluster = [i] + neighbors
+            in_cluster[cluster] = True
             
             # Expand cluster
             j = 0
             while j < len(cluster):
                 point = cluster[j]
                 
-                if point not in visited:
-                    visited.add(point)
+                if not visited[point]:
+                    visited[point] = True
                     
                     # Find neighbors of this point
-                    point_neighbors = []
-                    for k in range(n_points):
-                        if k != point:
-                            dist = _haversine_distance(
-                                coordinates[point][0], coordinates[point][1],
-                                coordinates[k][0], coordinates[k][1]
-                            )
-                            if dist <= eps:
-                                point_neighbors.append(k)
+                    point_neighbors = indices[indptr[point]:indptr[point + 1]].tolist()
                     
                     # Add new neighbors to cluster
                     for neighbor in point_neighbors:
-                        if neighbor not in cluster:
+                        if not in_cluster[neighbor]:
+                            in_cluster[neighbor] = True
                             cluster.append(neighbor)
                         if labels[neighbor] == -1:
                             labels[neighbor] = cluster_id
                 
                 j += 1
             
+            in_cluster[cluster] = False
             cluster_id += 1
     
     return labels
 
 
+def _neighbor_graph(coordinates: np.ndarray, eps: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Neighbors within eps (haversine, degrees) of each point, as a CSR graph.
+    
+    Returns (indptr, indices): the neighbors of point i, excluding i itself
+    and in ascending order, are indices[indptr[i]:indptr[i + 1]].
+    
+    With SciPy, points are mapped to 3-D unit vectors and queried with a
+    KD-tree: chord length grows monotonically with great-circle angle, so
+    a ball query of radius 2*sin(eps/2) finds exactly the haversine
+    neighbors in O(N log N). Otherwise pairwise distances are compared,
+    in parallel native code when Numba is available.
+    """
+    n_points = len(coordinates)
+    coords_rad = np.radians(np.asarray(coordinates, dtype=np.float64))
+    eps_rad = float(np.radians(eps))
+    
+    if SCIPY_AVAILABLE and n_points:
+        xyz = _unit_vectors(coords_rad)
+        # Slightly padded radius; candidates are then confirmed with the
+        # haversine itself so results at exactly eps match the other paths
+        chord = _chord_length(eps_rad) * (1.0 + 1e-9)
+        
+        neighbor_lists = cKDTree(xyz).query_ball_point(xyz, r=chord, return_sorted=True)
+        counts = np.fromiter((len(neighbors) for neighbors in neighbor_lists), dtype=np.int64, count=n_points)
+        rows = np.repeat(np.arange(n_points), counts)
+        cols = np.fromiter(
+            (j for neighbors in neighbor_lists for j in neighbors), dtype=np.int64, count=int(counts.sum())
+        )
+        within = _haversine_angles(
+            coords_rad[rows, 0], coords_rad[rows, 1], coords_rad[cols, 0], coords_rad[cols, 1]
+        ) <= eps_rad
+        rows = rows[within]
+        cols = cols[within]
+    elif NUMBA_AVAILABLE:
+        return _neighbor_graph_kernel(coords_rad, eps_rad)
+    else:
+        # Pairwise distances, a block of rows at a time to bound memory
+        row_blocks = []
+        col_blocks = []
+        for start in range(0, n_points, _PAIRWISE_BLOCK_ROWS):
+            block = _haversine_matrix(coords_rad[start:start + _PAIRWISE_BLOCK_ROWS], coords_rad)
+            block_rows, block_cols = np.nonzero(block <= eps_rad)
+            row_blocks.append(block_rows + start)
+            col_blocks.append(block_cols)
+        rows = np.concatenate(row_blocks) if row_blocks else np.empty(0, np.int64)
+        cols = np.concatenate(col_blocks) if col_blocks else np.empty(0, np.int64)
+    
+    # Drop each point's match with itself
+    keep = rows != cols
+    rows = rows[keep]
+    indices = cols[keep].astype(np.int64)
+    indptr = np.zeros(n_points + 1, np.int64)
+    indptr[1:] = np.cumsum(np.bincount(rows, minlength=n_points))
+    
+    return indptr, indices
+
+
+def _unit_vectors(coords_rad: np.ndarray) -> np.ndarray:
+    """Map (lat, lon) radians to 3-D unit vectors on the sphere."""
+    lat = coords_rad[:, 0]
+    lon = coords_rad[:, 1]
+    return np.column_stack((np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)))
+
+
+def _chord_length(angle_rad: float) -> float:
+    """
+    Straight-line distance between unit vectors separated by angle_rad.
+    
+    Monotonic in the great-circle angle, so Euclidean radius queries on
+    unit vectors select exactly the points within that angle.
+    """
+    return float(2.0 * np.sin(min(angle_rad, np.pi) / 2.0))
+
+
+def _haversine_matrix(coords_a_rad: np.ndarray, coords_b_rad: np.ndarray) -> np.ndarray:
+    """
+    Pairwise great-circle angles (radians) between two sets of (lat, lon) points.
+    
+    Both inputs are (N, 2) arrays in radians; returns an (len(a), len(b)) array.
+    """
+    return _haversine_angles(
+        coords_a_rad[:, 0][:, None], coords_a_rad[:, 1][:, None],
+        coords_b_rad[:, 0][None, :], coords_b_rad[:, 1][None, :]
+    )
+
+
+def _haversine_angles(lat1, lon1, lat2, lon2):
+    """Great-circle angles (radians) between points in radians; broadcasts over arrays."""
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def _haversine_rad(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle angle (radians) between two points given in radians."""
+    a = sin((lat2 - lat1) / 2) ** 2 + cos(lat1) * cos(lat2) * sin((lon2 - lon1) / 2) ** 2
+    return 2 * asin(sqrt(a))
+
+
 def _haversine_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     """
     Calculate haversine distance between two points in degrees.
     
-    Returns distance in degrees (not km).
+    Returns distance in degrees (not km). Callers with many points should
+    convert once and use _haversine_rad or _haversine_angles directly.
     """
-    from math import radians, cos, sin, asin, sqrt
+    return _haversine_rad(
+        radians(lat1), radians(lon1), radians(lat2), radians(lon2)
+    ) * _DEGREES_PER_RADIAN
+
+
+@dataclass
+class _LocationIndex:
+    """Nearest-location lookup built once from a location_coordinates dict."""
+    location_ids: List[str]
+    coords_rad: np.ndarray
+    tree: Optional[Any]  # haversine BallTree when sklearn is available
+    lat_order: Optional[np.ndarray] = None  # latitude sort order without a tree
+    sorted_lats: Optional[np.ndarray] = None
+
+
+def _build_location_index(
+    location_coordinates: Dict[str, Tuple[float, float]]
+) -> Optional[_LocationIndex]:
+    """Build a _LocationIndex (None if there are no locations)."""
+    if not location_coordinates:
+        return None
     
-    # Convert to radians
-    lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
+    coords_rad = np.radians(np.array(list(location_coordinates.values()), dtype=np.float64))
+    location_ids = list(location_coordinates.keys())
     
-    # Haversine formula
-    dlat = lat2 - lat1
-    dlon = lon2 - lon1
-    a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-    c = 2 * asin(sqrt(a))
+    if SKLEARN_AVAILABLE:
+        return _LocationIndex(location_ids, coords_rad, BallTree(coords_rad, metric='haversine'))
     
-    # Convert back to degrees (approximate)
-    return c * 180 / 3.141592653589793
+    lat_order = np.argsort(coords_rad[:, 0], kind="stable")
+    return _LocationIndex(
+        location_ids, coords_rad, None,
+        lat_order=lat_order,
+        sorted_lats=coords_rad[lat_order, 0]
+    )
 
 
 def _find_nearest_location(
     lat: float,
     lon: float,
-    location_coordinates: Dict[str, Tuple[float, float]]
+    location_coordinates: Dict[str, Tuple[float, float]],
+    location_index: Optional[_LocationIndex] = None
 ) -> str:
-    """Find nearest location to given coordinates."""
-    min_dist = float('inf')
-    nearest_id = None
+    """
+    Find nearest location to given coordinates.
+    
+    Pass a prebuilt location_index when looking up many points against the
+    same locations.
+    """
+    if location_index is None:
+        location_index = _build_location_index(location_coordinates)
+    if location_index is None:
+        return "unknown"
+    
+    point = np.radians([[lat, lon]])
     
-    for loc_id, (loc_lat, loc_lon) in location_coordinates.items():
-        dist = _haversine_distance(lat, lon, loc_lat, loc_lon)
-        if dist < min_dist:
-            min_dist = dist
-            nearest_id = loc_id
+    if location_index.tree is not None:
+        distance, _ = location_index.tree.query(point, k=1)
+        # Re-collect everything at (or within rounding of) that distance and
+        # take the lowest index among the nearest, as a first-wins scan would
+        candidates, distances = location_index.tree.query_radius(
+            point, r=distance[0, 0] * (1 + 1e-9) + 1e-15, return_distance=True
+        )
+        candidates, distances = candidates[0], distances[0]
+        nearest = int(candidates[distances == distances.min()].min())
+    else:
+        # The latitude gap is a lower bound on the great-circle angle, so the
+        # distance to the closest-latitude location bounds the band to scan
+        lats = location_index.sorted_lats
+        pos = min(int(np.searchsorted(lats, point[0, 0])), len(lats) - 1)
+        if pos > 0 and point[0, 0] - lats[pos - 1] < lats[pos] - point[0, 0]:
+            pos -= 1
+        bound = _haversine_matrix(
+            point, location_index.coords_rad[location_index.lat_order[pos:pos + 1]]
+        )[0, 0] * (1 + 1e-9) + 1e-15
+        lo = np.searchsorted(lats, point[0, 0] - bound, side="left")
+        hi = np.searchsorted(lats, point[0, 0] + bound, side="right")
+        
+        candidates = location_index.lat_order[lo:hi]
+        distances = _haversine_matrix(point, location_index.coords_rad[candidates])[0]
+        nearest = int(candidates[distances == distances.min()].min())
     
-    return nearest_id or list(location_coordinates.keys())[0] if location_coordinates else "unknown"
+    return location_index.location_ids[nearest] or location_index.location_ids[0]
 
 
 def calculate_hotspot_trend(
@@ -311,17 +783,15 @@ def calculate_hotspot_trend(
         return "STABLE"
     
     # Sort by date
-    historical_scores.sort(key=lambda x: x[0])
+    historical_scores.sort(key=itemgetter(0))
     
     # Calculate trend
-    scores = [score for _, score in historical_scores]
-    
-    # Simple linear trend
-    n = len(scores)
-    x = np.arange(n)
+    scores = np.fromiter(map(itemgetter(1), historical_scores), dtype=np.float64)
     
-    # Calculate slope
-    slope = np.polyfit(x, scores, 1)[0]
+    # Simple linear trend: closed-form least-squares slope
+    x = np.arange(len(scores), dtype=np.float64)
+    x -= x.mean()
+    slope = (x * (scores - scores.mean())).sum() / (x * x).sum()
     
     # Determine trend
     if slope > 0.5:
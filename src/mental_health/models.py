@@ -5,13 +5,13 @@ This module defines database models for storing mental health indicators,
 counseling records, hotline transcripts, and related data in a privacy-preserving way.
 """
 from sqlalchemy import (
-    Column, String, Integer, Float, DateTime, ForeignKey,
+    event, Column, String, Integer, Float, DateTime, ForeignKey,
     Index, Text, Enum as SQLEnum, JSON, Boolean
 )
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
-from datetime import datetime
+from sqlalchemy.dialects.postgresql import UUID, ARRAY, JSONB
+from sqlalchemy.orm import relationship, validates
+from sqlalchemy.sql import func, text
+from datetime import datetime, date
 import uuid
 import enum
 
@@ -49,6 +49,58 @@ class DataSourceType(str, enum.Enum):
     COMMUNITY_SURVEY = "COMMUNITY_SURVEY"
 
 
+def _indicator_array():
+    """Indicator list type: native enum array on PostgreSQL, JSON elsewhere."""
+    return JSON().with_variant(ARRAY(SQLEnum(MentalHealthIndicator)), "postgresql")
+
+
+def _string_array():
+    """String list type: text array on PostgreSQL, JSON elsewhere."""
+    return JSON().with_variant(ARRAY(String), "postgresql")
+
+
+def _json_document():
+    """JSON document type: binary JSONB on PostgreSQL, JSON elsewhere."""
+    return JSON().with_variant(JSONB, "postgresql")
+
+
+# Monthly partitions created with a range-partitioned table; later months
+# fall into the default partition until maintenance adds them
+_PARTITION_MONTHS_BACK = 24
+_PARTITION_MONTHS_AHEAD = 3
+
+
+def _month_start(month_index: int) -> date:
+    """First day of the month for a year * 12 + (month - 1) index."""
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def _add_monthly_partitions(table) -> None:
+    """
+    Create monthly and default partitions when table is created on PostgreSQL.
+    
+    table must be declared with postgresql_partition_by "RANGE (<column>)".
+    """
+    @event.listens_for(table, "after_create")
+    def _create_partitions(target, connection, **kw):
+        if connection.dialect.name != "postgresql":
+            return
+        
+        name = target.name
+        today = date.today()
+        current = today.year * 12 + today.month - 1
+        
+        connection.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {name}_default PARTITION OF {name} DEFAULT"
+        ))
+        for month in range(current - _PARTITION_MONTHS_BACK, current + _PARTITION_MONTHS_AHEAD + 1):
+            start, end = _month_start(month), _month_start(month + 1)
+            connection.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {name}_{start:%Y_%m} PARTITION OF {name} "
+                f"FOR VALUES FROM ('{start}') TO ('{end}')"
+            ))
+
+
 class CounselingSession(Base):
     """
     Aggregated counseling session data (anonymized).
@@ -90,6 +142,7 @@ class CounselingSession(Base):
     )
     session_date = Column(
         DateTime(timezone=True),
+        primary_key=True,  # Partition key must be part of the primary key
         nullable=False,
         index=True
     )
@@ -135,7 +188,7 @@ class CounselingSession(Base):
         nullable=True
     )
     metadata_json = Column(
-        JSON,
+        _json_document(),
         nullable=True
     )
     created_at = Column(
@@ -158,6 +211,11 @@ class CounselingSession(Base):
         Index("idx_counseling_location_date", "location_id", "session_date"),
         Index("idx_counseling_indicator_severity", "primary_indicator", "severity"),
         Index("idx_counseling_crisis", "is_crisis_session", "session_date"),
+        Index(
+            "idx_counseling_date_brin", "session_date",
+            postgresql_using="brin", postgresql_with={"pages_per_range": 32}
+        ),
+        {"postgresql_partition_by": "RANGE (session_date)"},
     )
 
 
@@ -200,6 +258,7 @@ class CrisisHotlineTranscript(Base):
     )
     call_date = Column(
         DateTime(timezone=True),
+        primary_key=True,  # Partition key must be part of the primary key
         nullable=False,
         index=True
     )
@@ -213,7 +272,7 @@ class CrisisHotlineTranscript(Base):
         index=True
     )
     primary_indicators = Column(
-        JSON,  # Array of MentalHealthIndicator enum values
+        _indicator_array(),  # Array of MentalHealthIndicator enum values
         nullable=False
     )
     crisis_score = Column(
@@ -230,7 +289,7 @@ class CrisisHotlineTranscript(Base):
         nullable=True
     )
     keywords_detected = Column(
-        JSON,  # Anonymized keywords only
+        _string_array(),  # Anonymized keywords only
         nullable=True
     )
     intervention_provided = Column(
@@ -247,7 +306,7 @@ class CrisisHotlineTranscript(Base):
         nullable=True
     )
     metadata_json = Column(
-        JSON,
+        _json_document(),
         nullable=True
     )
     created_at = Column(
@@ -263,6 +322,13 @@ class CrisisHotlineTranscript(Base):
     __table_args__ = (
         Index("idx_hotline_location_date", "location_id", "call_date"),
         Index("idx_hotline_crisis_score", "crisis_score", "call_date"),
+        Index("idx_hotline_indicators_gin", "primary_indicators", postgresql_using="gin"),
+        Index("idx_hotline_keywords_gin", "keywords_detected", postgresql_using="gin"),
+        Index(
+            "idx_hotline_date_brin", "call_date",
+            postgresql_using="brin", postgresql_with={"pages_per_range": 32}
+        ),
+        {"postgresql_partition_by": "RANGE (call_date)"},
     )
 
 
@@ -304,6 +370,7 @@ class SocialMediaSentiment(Base):
     )
     date = Column(
         DateTime(timezone=True),
+        primary_key=True,  # Partition key must be part of the primary key
         nullable=False,
         index=True
     )
@@ -340,7 +407,7 @@ class SocialMediaSentiment(Base):
         nullable=True
     )
     metadata_json = Column(
-        JSON,
+        _json_document(),
         nullable=True
     )
     created_at = Column(
@@ -356,6 +423,11 @@ class SocialMediaSentiment(Base):
     __table_args__ = (
         Index("idx_social_location_date", "location_id", "date"),
         Index("idx_social_sentiment_date", "sentiment_score", "date"),
+        Index(
+            "idx_social_date_brin", "date",
+            postgresql_using="brin", postgresql_with={"pages_per_range": 32}
+        ),
+        {"postgresql_partition_by": "RANGE (date)"},
     )
 
 
@@ -395,6 +467,7 @@ class SchoolAbsenteeism(Base):
     )
     date = Column(
         DateTime(timezone=True),
+        primary_key=True,  # Partition key must be part of the primary key
         nullable=False,
         index=True
     )
@@ -426,7 +499,7 @@ class SchoolAbsenteeism(Base):
         index=True
     )
     metadata_json = Column(
-        JSON,
+        _json_document(),
         nullable=True
     )
     created_at = Column(
@@ -442,9 +515,21 @@ class SchoolAbsenteeism(Base):
     __table_args__ = (
         Index("idx_absenteeism_location_date", "location_id", "date"),
         Index("idx_absenteeism_rate_date", "absence_rate", "date"),
+        Index(
+            "idx_absenteeism_date_brin", "date",
+            postgresql_using="brin", postgresql_with={"pages_per_range": 32}
+        ),
+        {"postgresql_partition_by": "RANGE (date)"},
     )
 
 
+# Append-mostly time series queried by date range
+_add_monthly_partitions(CounselingSession.__table__)
+_add_monthly_partitions(CrisisHotlineTranscript.__table__)
+_add_monthly_partitions(SocialMediaSentiment.__table__)
+_add_monthly_partitions(SchoolAbsenteeism.__table__)
+
+
 class MentalHealthHotspot(Base):
     """
     Mental health hotspot detection results.
@@ -494,11 +579,11 @@ class MentalHealthHotspot(Base):
         index=True
     )
     primary_indicators = Column(
-        JSON,
+        _indicator_array(),
         nullable=False
     )
     contributing_factors = Column(
-        JSON,
+        _json_document(),
         nullable=True
     )
     severity = Column(
@@ -530,7 +615,7 @@ class MentalHealthHotspot(Base):
         default=False
     )
     metadata_json = Column(
-        JSON,
+        _json_document(),
         nullable=True
     )
     created_at = Column(
@@ -552,6 +637,17 @@ class MentalHealthHotspot(Base):
     __table_args__ = (
         Index("idx_hotspot_location_active", "location_id", "is_active"),
         Index("idx_hotspot_score_date", "hotspot_score", "detected_date"),
+        Index("idx_hotspot_indicators_gin", "primary_indicators", postgresql_using="gin"),
+        Index(
+            "idx_hotspot_factors_gin", "contributing_factors",
+            postgresql_using="gin",
+            postgresql_ops={"contributing_factors": "jsonb_path_ops"}
+        ),
+        # Recent active hotspots; BRIN fits the append-mostly detection dates
+        Index(
+            "idx_hotspot_active_brin", "detected_date",
+            postgresql_using="brin", postgresql_where=text("is_active = true")
+        ),
     )
 
 
@@ -615,7 +711,7 @@ class MentalHealthResource(Base):
         nullable=True
     )
     metadata_json = Column(
-        JSON,
+        _json_document(),
         nullable=True
     )
     created_at = Column(
@@ -637,4 +733,9 @@ class MentalHealthResource(Base):
     __table_args__ = (
         Index("idx_resource_location_type", "location_id", "resource_type"),
     )
+    
+    @validates("availability_status")
+    def _normalize_availability_status(self, key, value):
+        """Store availability status upper-cased so readers can compare it as is."""
+        return value.upper() if value else value
 
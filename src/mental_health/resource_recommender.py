@@ -4,9 +4,18 @@ Resource recommendation engine for mental health hotspots.
 This module provides intelligent resource recommendations based on detected
 mental health hotspots and available resources.
 """
+import asyncio
+import heapq
+import re
+import sys
+import uuid
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from functools import lru_cache
+from operator import attrgetter
+
+import numpy as np
 
 from ..utils.logger import api_logger
 from .models import (
@@ -18,8 +27,200 @@ from .models import (
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+# Numba compiles the batch scoring kernel to native code
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+# National-level resources (e.g., national hotlines)
+_NATIONAL_RESOURCES = (
+    {
+        "name": "National Suicide Prevention Lifeline",
+        "type": "crisis_hotline",
+        "contact": "988",
+        "available_24_7": True,
+        "languages": ["English", "Spanish"],
+        "services": ["Crisis support", "Suicide prevention", "Mental health support"]
+    },
+    {
+        "name": "Crisis Text Line",
+        "type": "crisis_hotline",
+        "contact": "Text HOME to 741741",
+        "available_24_7": True,
+        "services": ["Crisis support via text", "Mental health support"]
+    },
+    {
+        "name": "SAMHSA National Helpline",
+        "type": "information_and_referral",
+        "contact": "1-800-662-HELP (4357)",
+        "available_24_7": True,
+        "services": ["Substance abuse support", "Mental health referrals", "Treatment locator"]
+    }
+)
+
+# Lowercased services text of each national resource, for indicator filtering
+_NATIONAL_SERVICES_LOWER = tuple(
+    " ".join(resource.get("services", [])).lower() for resource in _NATIONAL_RESOURCES
+)
+
+
+def _copy_national_resource(resource: Dict[str, Any]) -> Dict[str, Any]:
+    """Fresh copy of a national resource, lists included, for a caller to keep."""
+    return {
+        key: list(value) if isinstance(value, list) else value
+        for key, value in resource.items()
+    }
+
+
+# Service keywords per indicator, scanned in one pass; the lookahead lets
+# overlapping keywords from different groups all be found
+_SERVICE_KEYWORDS_RE = re.compile(
+    r"(?=(?P<CRISIS>crisis|emergency|hotline)"
+    r"|(?P<ANXIETY>anxiety|panic|stress)"
+    r"|(?P<DEPRESSION>depression|mood|mental health))"
+)
+
+# Matched-service label for each keyword group above
+_SERVICE_MATCH_LABELS = {
+    "CRISIS": "crisis_support",
+    "ANXIETY": "anxiety_support",
+    "DEPRESSION": "depression_support"
+}
+
+
+# Resource columns read when scoring and building recommendations, taken from
+# the Core table so the query skips ORM entity loading
+_RESOURCE_TABLE = MentalHealthResource.__table__
+_RESOURCE_COLUMNS = (
+    _RESOURCE_TABLE.c.id,
+    _RESOURCE_TABLE.c.location_id,
+    _RESOURCE_TABLE.c.name,
+    _RESOURCE_TABLE.c.resource_type,
+    _RESOURCE_TABLE.c.services_offered,
+    _RESOURCE_TABLE.c.capacity,
+    _RESOURCE_TABLE.c.availability_status
+)
+
+
+# Immediate actions for severe hotspots
+_SEVERITY_IMMEDIATE_ACTIONS = {
+    MentalHealthSeverity.CRITICAL: (
+        "Activate crisis response team immediately",
+        "Deploy mobile mental health units",
+        "Increase hotline staffing",
+        "Coordinate with emergency services"
+    ),
+    MentalHealthSeverity.SEVERE: (
+        "Mobilize mental health resources",
+        "Increase counseling availability",
+        "Distribute crisis support information"
+    )
+}
+
+# (resource type keywords, fallback name, action templates) per resource kind;
+# {name} is the resource name or the fallback
+_RESOURCE_ACTION_RULES = (
+    (("hotline", "crisis"), "crisis hotline", (
+        "Promote {name} in affected area",
+        "Distribute hotline number through public health channels"
+    )),
+    (("counselor", "therapist"), "counseling services", (
+        "Refer individuals to {name}",
+        "Coordinate appointment scheduling"
+    )),
+    (("support_group",), None, (
+        "Organize support group meetings in affected area",
+        "Provide transportation assistance if needed"
+    )),
+    (("emergency",), None, (
+        "Pre-position emergency mental health services",
+        "Coordinate with emergency response teams"
+    ))
+)
+
+
+# Score multiplier per hotspot severity
+_SEVERITY_MULTIPLIERS = {
+    MentalHealthSeverity.CRITICAL: 1.2,
+    MentalHealthSeverity.SEVERE: 1.1,
+    MentalHealthSeverity.MODERATE: 1.0,
+    MentalHealthSeverity.MILD: 0.9
+}
+
+# Score multiplier per availability keyword, in precedence order: the first
+# keyword found in the status applies (so "UNAVAILABLE" matches "AVAILABLE")
+_AVAILABILITY_MULTIPLIERS = (
+    ("AVAILABLE", 1.1),
+    ("OPEN", 1.1),
+    ("FULL", 0.7),
+    ("UNAVAILABLE", 0.7),
+    ("WAITLIST", 0.9)
+)
+
+# Below this many resources the per-resource Python scoring loop is cheaper
+# than encoding the resources into arrays
+_VECTORIZE_MIN_RESOURCES = 32
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, parallel=True)
+    def _score_batch(type_masks, services_masks, indicator_bits, severity_mult, availability_mult):
+        """Relevance scores of encoded resources, resources scored in parallel."""
+        n = type_masks.shape[0]
+        scores = np.empty(n, np.float64)
+        for i in prange(n):
+            score = 0.0
+            for bit in indicator_bits:
+                if type_masks[i] & bit:
+                    score += 0.4
+                if services_masks[i] & bit:
+                    score += 0.3
+            score *= severity_mult
+            score *= availability_mult[i]
+            scores[i] = min(1.0, score)
+        return scores
+    
+    # Compile (or load from the on-disk cache) at import rather than on the
+    # first recommendation request
+    _score_batch(
+        np.zeros(1, np.int64), np.zeros(1, np.int64), np.zeros(1, np.int64), 1.0, np.ones(1)
+    )
+
+
+# Interned canonical name per indicator; members are str-valued, so plain
+# upper-case strings find their entry too
+_INDICATOR_STR = {indicator: sys.intern(indicator.value) for indicator in MentalHealthIndicator}
+
+
+def _indicator_key(indicator) -> str:
+    """Upper-case indicator name for an indicator given as an enum or string."""
+    key = _INDICATOR_STR.get(indicator)
+    if key is None:
+        key = indicator.upper() if isinstance(indicator, str) else indicator.value
+    return key
 
-@dataclass
+
+@lru_cache(maxsize=1024)
+def _availability_multiplier(availability_status: Optional[str]) -> float:
+    """
+    Score multiplier for a resource's availability status.
+    
+    Statuses are stored upper-cased, but rows written before that are
+    normalized here too; the few distinct statuses keep the cache hot.
+    """
+    if not availability_status:
+        return 1.0
+    availability = availability_status.upper()
+    return next(
+        (mult for keyword, mult in _AVAILABILITY_MULTIPLIERS if keyword in availability),
+        1.0
+    )
+
+
+@dataclass(slots=True)
 class ResourceRecommendation:
     """Resource recommendation for a hotspot."""
     resource_id: str
@@ -30,6 +231,19 @@ class ResourceRecommendation:
     availability_status: str
     services_match: List[str]
     recommended_actions: List[str]
+    # Ranking key: relevance first, then nearer resources
+    _sort_key: Tuple[float, float] = field(default=(0.0, 0.0), repr=False, compare=False)
+    
+    def to_plan_dict(self) -> Dict[str, Any]:
+        """Entry for the resource_recommendations list of an action plan."""
+        return {
+            "resource_id": self.resource_id,
+            "name": self.resource_name,
+            "type": self.resource_type,
+            "relevance_score": self.relevance_score,
+            "distance_km": self.distance_km,
+            "actions": self.recommended_actions
+        }
 
 
 class ResourceRecommendationEngine:
@@ -48,6 +262,20 @@ class ResourceRecommendationEngine:
             "PTSD": ["trauma_therapist", "ptsd_support_group", "psychiatrist"],
             "EATING_DISORDER": ["eating_disorder_clinic", "nutritionist", "therapist"]
         }
+        # Lowercased priority types, matched against lowercased resource types
+        self._priority_lower = {
+            indicator: tuple(pt.lower() for pt in types)
+            for indicator, types in self.resource_priority.items()
+        }
+        
+        # One bit per indicator; a resource type maps to the bits of the
+        # indicators whose priority types it matches
+        indicator_names = dict.fromkeys([*self.resource_priority, *_SERVICE_MATCH_LABELS])
+        self._indicator_bits = {name: 1 << i for i, name in enumerate(indicator_names)}
+        self._service_mask = 0
+        for name in _SERVICE_MATCH_LABELS:
+            self._service_mask |= self._indicator_bits[name]
+        self._type_masks: Dict[str, int] = {}
     
     async def recommend_resources_for_hotspot(
         self,
@@ -72,19 +300,69 @@ class ResourceRecommendationEngine:
             db_session
         )
         
+        return self._rank_resources(hotspot, available_resources, max_recommendations)
+    
+    async def recommend_resources_for_hotspots(
+        self,
+        hotspots: List[MentalHealthHotspot],
+        db_session: AsyncSession,
+        max_recommendations: int = 5
+    ) -> List[List[ResourceRecommendation]]:
+        """
+        Recommend resources for several hotspots.
+        
+        Resources for all hotspot locations are fetched with one query.
+        
+        Args:
+            hotspots: Mental health hotspots
+            db_session: Database session
+            max_recommendations: Maximum number of recommendations per hotspot
+            
+        Returns:
+            List of resource recommendations for each hotspot, in order
+        """
+        resources_by_location = await self._get_resources_for_locations(
+            [hotspot.location_id for hotspot in hotspots],
+            db_session
+        )
+        
+        return [
+            self._rank_resources(
+                hotspot,
+                resources_by_location.get(hotspot.location_id, []),
+                max_recommendations
+            )
+            for hotspot in hotspots
+        ]
+    
+    def _rank_resources(
+        self,
+        hotspot: MentalHealthHotspot,
+        available_resources: List[MentalHealthResource],
+        max_recommendations: int
+    ) -> List[ResourceRecommendation]:
+        """Score a location's resources for a hotspot and return the best ones."""
         if not available_resources:
             api_logger.warning(f"No resources found for location {hotspot.location_id}")
             return []
         
-        # Score resources based on hotspot indicators
+        # Score resources based on hotspot indicators, normalized once
+        indicator_keys = tuple(_indicator_key(indicator) for indicator in hotspot.primary_indicators)
+        if len(available_resources) >= _VECTORIZE_MIN_RESOURCES:
+            resource_scores = self._score_resources_vectorized(
+                available_resources,
+                hotspot,
+                indicator_keys
+            )
+        else:
+            resource_scores = [
+                self._score_resource_relevance(resource, hotspot, indicator_keys)
+                for resource in available_resources
+            ]
+        
         scored_resources = []
         
-        for resource in available_resources:
-            score, matched_services = self._score_resource_relevance(
-                resource,
-                hotspot
-            )
-            
+        for resource, (score, matched_services) in zip(available_resources, resource_scores):
             if score > 0.0:  # Only recommend relevant resources
                 # Calculate distance (simplified - would use actual geocoding)
                 distance = self._calculate_distance(
@@ -103,17 +381,16 @@ class ResourceRecommendationEngine:
                     recommended_actions=self._generate_resource_actions(
                         resource,
                         hotspot
-                    )
+                    ),
+                    _sort_key=(score, -distance if distance else 0)
                 ))
         
-        # Sort by relevance score and distance
-        scored_resources.sort(
-            key=lambda r: (r.relevance_score, -r.distance_km if r.distance_km else 0),
-            reverse=True
+        # Return top recommendations by relevance score and distance
+        return heapq.nlargest(
+            max_recommendations,
+            scored_resources,
+            key=attrgetter("_sort_key")
         )
-        
-        # Return top recommendations
-        return scored_resources[:max_recommendations]
     
     async def _get_resources_for_location(
         self,
@@ -121,96 +398,214 @@ class ResourceRecommendationEngine:
         db_session: AsyncSession
     ) -> List[MentalHealthResource]:
         """Get available resources for a location."""
-        try:
-            result = await db_session.execute(
-                select(MentalHealthResource).where(
-                    MentalHealthResource.location_id == location_id
+        resources_by_location = await self._get_resources_for_locations(
+            [location_id],
+            db_session
+        )
+        return resources_by_location.get(location_id, [])
+    
+    async def _get_resources_for_locations(
+        self,
+        location_ids: List[str],
+        db_session: AsyncSession
+    ) -> Dict[Any, List[MentalHealthResource]]:
+        """
+        Get available resources for several locations with a single IN query.
+        
+        Resources are rows of _RESOURCE_COLUMNS, read by attribute like
+        model instances.
+        
+        Returns:
+            Dictionary mapping each location_id to its resources
+        """
+        # Grouped under str(location_id), so a location requested both as a
+        # UUID and as a string is fetched once and served to both
+        keys = {location_id: str(location_id) for location_id in location_ids}
+        resources_by_key = {key: [] for key in keys.values()}
+        
+        if resources_by_key:
+            try:
+                # The column binds UUIDs, whichever form the ids came in
+                result = await db_session.execute(
+                    select(*_RESOURCE_COLUMNS).where(
+                        _RESOURCE_TABLE.c.location_id.in_(
+                            [uuid.UUID(key) for key in resources_by_key]
+                        )
+                    )
                 )
-            )
-            resources = result.scalars().all()
-            return list(resources)
-        except Exception as e:
-            api_logger.error(f"Failed to get resources for location: {str(e)}")
-            return []
+                resources = result.all()
+            except Exception as e:
+                api_logger.error(f"Failed to get resources for location: {str(e)}")
+                resources = []
+            
+            for resource in resources:
+                resources_by_key[str(resource.location_id)].append(resource)
+        
+        return {
+            location_id: list(resources_by_key[key])
+            for location_id, key in keys.items()
+        }
     
     def _score_resource_relevance(
         self,
         resource: MentalHealthResource,
-        hotspot: MentalHealthHotspot
+        hotspot: MentalHealthHotspot,
+        indicator_keys: Tuple[str, ...]
     ) -> Tuple[float, List[str]]:
         """
         Score resource relevance for hotspot.
         
+        Args:
+            resource: Resource to score
+            hotspot: Hotspot the resource is scored for
+            indicator_keys: The hotspot's primary indicators as upper-case names
+        
         Returns:
             Tuple of (score, matched_services)
         """
         score = 0.0
-        matched_services = []
+        # Insertion-ordered set of matches
+        matched_services: Dict[str, None] = {}
         
         # Base score for resource type
         resource_type = resource.resource_type.lower()
+        type_mask = self._resource_type_mask(resource_type)
+        
+        hotspot_mask = 0
+        for indicator_str in indicator_keys:
+            hotspot_mask |= self._indicator_bits.get(indicator_str, 0)
+        
+        # Nothing can score when no indicator matches the resource type and
+        # none can be matched through services
+        if not hotspot_mask & (type_mask | self._service_mask):
+            return 0.0, []
+        
+        # Keyword groups found in the services offered, computed once
+        services_mask = 0
+        if hotspot_mask & self._service_mask:
+            services_mask = self._services_mask(resource.services_offered)
         
         # Score based on primary indicators
-        for indicator in hotspot.primary_indicators:
-            indicator_str = indicator.upper() if isinstance(indicator, str) else indicator.value
+        for indicator_str in indicator_keys:
+            bit = self._indicator_bits.get(indicator_str, 0)
             
             # Check if resource type matches indicator priority
-            priority_types = self.resource_priority.get(indicator_str, [])
-            if any(pt in resource_type for pt in priority_types):
+            if type_mask & bit:
                 score += 0.4
-                matched_services.append(indicator_str)
+                matched_services[indicator_str] = None
             
-            # Check services offered
-            if resource.services_offered:
-                services = resource.services_offered
-                if isinstance(services, list):
-                    service_str = " ".join(services).lower()
-                else:
-                    service_str = str(services).lower()
-                
-                # Match services to indicators
-                if indicator_str == "CRISIS" and any(
-                    kw in service_str for kw in ["crisis", "emergency", "hotline"]
-                ):
-                    score += 0.3
-                    matched_services.append(f"crisis_support")
-                
-                elif indicator_str == "ANXIETY" and any(
-                    kw in service_str for kw in ["anxiety", "panic", "stress"]
-                ):
-                    score += 0.3
-                    matched_services.append(f"anxiety_support")
-                
-                elif indicator_str == "DEPRESSION" and any(
-                    kw in service_str for kw in ["depression", "mood", "mental health"]
-                ):
-                    score += 0.3
-                    matched_services.append(f"depression_support")
-        
-        # Adjust score based on hotspot severity
-        severity_multiplier = {
-            MentalHealthSeverity.CRITICAL: 1.2,
-            MentalHealthSeverity.SEVERE: 1.1,
-            MentalHealthSeverity.MODERATE: 1.0,
-            MentalHealthSeverity.MILD: 0.9
-        }.get(hotspot.severity, 1.0)
-        
-        score *= severity_multiplier
-        
-        # Adjust for availability
-        if resource.availability_status:
-            availability = resource.availability_status.upper()
-            if "AVAILABLE" in availability or "OPEN" in availability:
-                score *= 1.1
-            elif "FULL" in availability or "UNAVAILABLE" in availability:
-                score *= 0.7
-            elif "WAITLIST" in availability:
-                score *= 0.9
-        
-        # Normalize score
-        score = min(1.0, score)
-        
-        return score, list(set(matched_services))
+            # Match services offered to indicators
+            if services_mask & bit:
+                score += 0.3
+                matched_services[_SERVICE_MATCH_LABELS[indicator_str]] = None
+        
+        # Adjust for hotspot severity and availability, then normalize
+        severity_multiplier = _SEVERITY_MULTIPLIERS.get(hotspot.severity, 1.0)
+        availability_multiplier = _availability_multiplier(resource.availability_status)
+        return min(1.0, score * severity_multiplier * availability_multiplier), list(matched_services)
+    
+    def _vectorize_resources(
+        self,
+        resources: List[MentalHealthResource]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Encode resources into arrays for vectorized scoring.
+        
+        Returns:
+            Tuple of (type match bitmasks, services match bitmasks,
+            availability multipliers), one entry per resource
+        """
+        n = len(resources)
+        type_masks = np.fromiter(
+            (self._resource_type_mask(r.resource_type.lower()) for r in resources),
+            dtype=np.int64,
+            count=n
+        )
+        services_masks = np.fromiter(
+            (self._services_mask(r.services_offered) for r in resources),
+            dtype=np.int64,
+            count=n
+        )
+        availability_mult = np.fromiter(
+            (_availability_multiplier(r.availability_status) for r in resources),
+            dtype=np.float64,
+            count=n
+        )
+        return type_masks, services_masks, availability_mult
+    
+    def _score_resources_vectorized(
+        self,
+        resources: List[MentalHealthResource],
+        hotspot: MentalHealthHotspot,
+        indicator_keys: Tuple[str, ...]
+    ) -> List[Tuple[float, List[str]]]:
+        """
+        Score many resources at once; same results as _score_resource_relevance.
+        
+        Returns:
+            List of (score, matched_services) per resource
+        """
+        type_masks, services_masks, availability_mult = self._vectorize_resources(resources)
+        
+        severity_mult = _SEVERITY_MULTIPLIERS.get(hotspot.severity, 1.0)
+        
+        if NUMBA_AVAILABLE:
+            indicator_bits = np.fromiter(
+                (self._indicator_bits.get(indicator_str, 0) for indicator_str in indicator_keys),
+                dtype=np.int64,
+                count=len(indicator_keys)
+            )
+            scores = _score_batch(
+                type_masks, services_masks, indicator_bits, severity_mult, availability_mult
+            )
+        else:
+            # Accumulate per indicator in the same order as the scalar path
+            # so the scores are bit-for-bit identical
+            scores = np.zeros(len(resources))
+            for indicator_str in indicator_keys:
+                bit = self._indicator_bits.get(indicator_str, 0)
+                scores += np.where(type_masks & bit, 0.4, 0.0)
+                scores += np.where(services_masks & bit, 0.3, 0.0)
+            
+            scores *= severity_mult
+            scores *= availability_mult
+            np.minimum(scores, 1.0, out=scores)
+        
+        results = [(0.0, [])] * len(resources)
+        for i in np.flatnonzero(scores > 0.0).tolist():
+            matched_services: Dict[str, None] = {}
+            for indicator_str in indicator_keys:
+                bit = self._indicator_bits.get(indicator_str, 0)
+                if type_masks[i] & bit:
+                    matched_services[indicator_str] = None
+                if services_masks[i] & bit:
+                    matched_services[_SERVICE_MATCH_LABELS[indicator_str]] = None
+            results[i] = (float(scores[i]), list(matched_services))
+        return results
+    
+    def _services_mask(self, services_offered: Any) -> int:
+        """Bits of the keyword groups found in a resource's services offered."""
+        if not services_offered:
+            return 0
+        if isinstance(services_offered, list):
+            service_str = " ".join(services_offered).lower()
+        else:
+            service_str = str(services_offered).lower()
+        mask = 0
+        for match in _SERVICE_KEYWORDS_RE.finditer(service_str):
+            mask |= self._indicator_bits[match.lastgroup]
+        return mask
+    
+    def _resource_type_mask(self, resource_type: str) -> int:
+        """Bits of the indicators whose priority types occur in resource_type (lowercased)."""
+        mask = self._type_masks.get(resource_type)
+        if mask is None:
+            mask = 0
+            for indicator_str, priority_types in self._priority_lower.items():
+                if any(pt in resource_type for pt in priority_types):
+                    mask |= self._indicator_bits[indicator_str]
+            self._type_masks[resource_type] = mask
+        return mask
     
     def _calculate_distance(
         self,
@@ -240,21 +635,10 @@ class ResourceRecommendationEngine:
         
         resource_type = resource.resource_type.lower()
         
-        if "hotline" in resource_type or "crisis" in resource_type:
-            actions.append(f"Promote {resource.name or 'crisis hotline'} in affected area")
-            actions.append("Distribute hotline number through public health channels")
-        
-        if "counselor" in resource_type or "therapist" in resource_type:
-            actions.append(f"Refer individuals to {resource.name or 'counseling services'}")
-            actions.append("Coordinate appointment scheduling")
-        
-        if "support_group" in resource_type:
-            actions.append("Organize support group meetings in affected area")
-            actions.append("Provide transportation assistance if needed")
-        
-        if "emergency" in resource_type:
-            actions.append("Pre-position emergency mental health services")
-            actions.append("Coordinate with emergency response teams")
+        for keywords, default_name, templates in _RESOURCE_ACTION_RULES:
+            if any(kw in resource_type for kw in keywords):
+                name = resource.name or default_name
+                actions.extend(template.format(name=name) for template in templates)
         
         # General actions
         if resource.capacity:
@@ -280,47 +664,23 @@ class ResourceRecommendationEngine:
         # In production, would query from a national resources database
         # For now, return hardcoded national resources
         
-        national_resources = [
-            {
-                "name": "National Suicide Prevention Lifeline",
-                "type": "crisis_hotline",
-                "contact": "988",
-                "available_24_7": True,
-                "languages": ["English", "Spanish"],
-                "services": ["Crisis support", "Suicide prevention", "Mental health support"]
-            },
-            {
-                "name": "Crisis Text Line",
-                "type": "crisis_hotline",
-                "contact": "Text HOME to 741741",
-                "available_24_7": True,
-                "services": ["Crisis support via text", "Mental health support"]
-            },
-            {
-                "name": "SAMHSA National Helpline",
-                "type": "information_and_referral",
-                "contact": "1-800-662-HELP (4357)",
-                "available_24_7": True,
-                "services": ["Substance abuse support", "Mental health referrals", "Treatment locator"]
-            }
-        ]
-        
         # Filter by indicator if specified
         if indicator:
-            filtered = []
-            for resource in national_resources:
-                services = " ".join(resource.get("services", [])).lower()
-                indicator_str = indicator.value.lower()
-                
-                if indicator == MentalHealthIndicator.CRISIS or indicator == MentalHealthIndicator.SUICIDAL_IDEATION:
-                    if "crisis" in services or "suicide" in services:
-                        filtered.append(resource)
-                elif indicator_str in services:
-                    filtered.append(resource)
+            if indicator == MentalHealthIndicator.CRISIS or indicator == MentalHealthIndicator.SUICIDAL_IDEATION:
+                return [
+                    _copy_national_resource(resource)
+                    for resource, services in zip(_NATIONAL_RESOURCES, _NATIONAL_SERVICES_LOWER)
+                    if "crisis" in services or "suicide" in services
+                ]
             
-            return filtered
-        
-        return national_resources
+            indicator_str = indicator.value.lower()
+            return [
+                _copy_national_resource(resource)
+                for resource, services in zip(_NATIONAL_RESOURCES, _NATIONAL_SERVICES_LOWER)
+                if indicator_str in services
+            ]
+        
+        return [_copy_national_resource(resource) for resource in _NATIONAL_RESOURCES]
     
     async def recommend_action_plan(
         self,
@@ -337,14 +697,20 @@ class ResourceRecommendationEngine:
         Returns:
             Action plan dictionary
         """
-        # Get resource recommendations
-        resources = await self.recommend_resources_for_hotspot(hotspot, db_session)
-        
-        # Get national resources
-        national_resources = await self.get_national_resources(
-            db_session,
-            hotspot.primary_indicators[0] if hotspot.primary_indicators else None
+        # Get resource recommendations and national resources concurrently.
+        # Both share db_session, which is safe while the national lookup does
+        # not query it; both finish before any error is re-raised.
+        resources, national_resources = await asyncio.gather(
+            self.recommend_resources_for_hotspot(hotspot, db_session),
+            self.get_national_resources(
+                db_session,
+                hotspot.primary_indicators[0] if hotspot.primary_indicators else None
+            ),
+            return_exceptions=True
         )
+        for outcome in (resources, national_resources):
+            if isinstance(outcome, BaseException):
+                raise outcome
         
         # Build action plan
         action_plan = {
@@ -353,36 +719,16 @@ class ResourceRecommendationEngine:
             "hotspot_score": hotspot.hotspot_score,
             "severity": hotspot.severity.value,
             "immediate_actions": [],
-            "resource_recommendations": [
-                {
-                    "resource_id": r.resource_id,
-                    "name": r.resource_name,
-                    "type": r.resource_type,
-                    "relevance_score": r.relevance_score,
-                    "distance_km": r.distance_km,
-                    "actions": r.recommended_actions
-                }
-                for r in resources
-            ],
+            "resource_recommendations": list(map(ResourceRecommendation.to_plan_dict, resources)),
             "national_resources": national_resources,
             "monitoring_actions": [],
             "prevention_actions": []
         }
         
         # Immediate actions based on severity
-        if hotspot.severity == MentalHealthSeverity.CRITICAL:
-            action_plan["immediate_actions"].extend([
-                "Activate crisis response team immediately",
-                "Deploy mobile mental health units",
-                "Increase hotline staffing",
-                "Coordinate with emergency services"
-            ])
-        elif hotspot.severity == MentalHealthSeverity.SEVERE:
-            action_plan["immediate_actions"].extend([
-                "Mobilize mental health resources",
-                "Increase counseling availability",
-                "Distribute crisis support information"
-            ])
+        action_plan["immediate_actions"].extend(
+            _SEVERITY_IMMEDIATE_ACTIONS.get(hotspot.severity, ())
+        )
         
         # Indicator-specific immediate actions
         if MentalHealthIndicator.CRISIS in hotspot.primary_indicators:
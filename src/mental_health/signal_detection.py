@@ -5,28 +5,29 @@ This module provides algorithms for detecting mental health crisis signals
 from text data (counseling notes, hotline transcripts, social media) using
 NLP techniques while maintaining privacy.
 """
-from typing import Dict, Any, List, Tuple, Optional
+from typing import Dict, Any, FrozenSet, List, Tuple, Optional
 from datetime import datetime, timedelta
 import re
 import json
+import string
 from collections import Counter
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
+from importlib.util import find_spec
 import numpy as np
 
 from ..utils.logger import api_logger
 
-# Try to import NLP libraries (optional dependencies)
-try:
-    from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification
-    TRANSFORMERS_AVAILABLE = True
-except ImportError:
-    TRANSFORMERS_AVAILABLE = False
+# NLP libraries (optional dependencies) are only located here and imported
+# where they are used; loading them takes seconds and most callers never do
+TRANSFORMERS_AVAILABLE = find_spec("transformers") is not None
+TORCH_AVAILABLE = find_spec("torch") is not None
+TEXTBLOB_AVAILABLE = find_spec("textblob") is not None
 
 try:
-    from textblob import TextBlob
-    TEXTBLOB_AVAILABLE = True
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
 except ImportError:
-    TEXTBLOB_AVAILABLE = False
+    AHOCORASICK_AVAILABLE = False
 
 
 # Mental health crisis keywords with weights
@@ -85,8 +86,47 @@ DEPRESSION_KEYWORDS = {
     "empty": 6.0
 }
 
+# Keyword categories in the order _scan_all reports them, each as precompiled
+# (keyword, weight) pairs with the keyword score that normalizes to 10
+_KEYWORD_CATEGORIES = tuple(
+    (tuple(keywords.items()), sum(keywords.values()) * threshold)
+    for keywords, threshold in (
+        (CRISIS_KEYWORDS, 0.5),
+        (ANXIETY_KEYWORDS, 0.3),
+        (DEPRESSION_KEYWORDS, 0.3)
+    )
+)
+
+# Every keyword once; some belong to several categories
+_ALL_KEYWORDS = tuple(dict.fromkeys(
+    keyword for keywords, _ in _KEYWORD_CATEGORIES for keyword, _ in keywords
+))
+
+
+def _build_keyword_automaton():
+    """Aho-Corasick automaton over all category keywords."""
+    automaton = ahocorasick.Automaton()
+    for keyword in _ALL_KEYWORDS:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return automaton
+
 
-@dataclass
+# Built once so a single pass finds the keywords of every category
+_KEYWORD_AUTOMATON = _build_keyword_automaton() if AHOCORASICK_AVAILABLE else None
+
+# Word lists of the language pattern and rule-based sentiment heuristics;
+# each word counts once when it occurs anywhere in the lower-cased text
+_NEGATION_WORDS = ("no", "not", "never", "nothing", "nobody", "nowhere", "can't", "won't", "don't")
+_FIRST_PERSON_WORDS = ("i", "me", "my", "myself")
+_POSITIVE_WORDS = ("good", "great", "happy", "better", "improve", "hope", "help", "support")
+_NEGATIVE_WORDS = ("bad", "terrible", "awful", "horrible", "worse", "hopeless", "helpless", "fear")
+
+# Deletes the only upper-case characters ASCII text can contain
+_ASCII_UPPER_DELETE = str.maketrans("", "", string.ascii_uppercase)
+
+
+@dataclass(slots=True, frozen=True)
 class MentalHealthSignal:
     """Detected mental health signal."""
     indicator_type: str
@@ -113,6 +153,15 @@ class NLPModelManager:
             return False
         
         try:
+            from transformers import pipeline
+            
+            # Run on the first GPU when one is available
+            device = -1
+            if TORCH_AVAILABLE:
+                import torch
+                if torch.cuda.is_available():
+                    device = 0
+            
             # Initialize crisis detection model
             # Using a general mental health model or fine-tuned model
             model_name = "j-hartmann/emotion-english-distilroberta-base"
@@ -121,7 +170,8 @@ class NLPModelManager:
                     "text-classification",
                     model=model_name,
                     tokenizer=model_name,
-                    return_all_scores=True
+                    return_all_scores=True,
+                    device=device
                 )
             except Exception:
                 # Fallback to simpler model
@@ -132,13 +182,16 @@ class NLPModelManager:
             try:
                 self.sentiment_analyzer = pipeline(
                     "sentiment-analysis",
-                    model="cardiffnlp/twitter-roberta-base-sentiment-latest"
+                    model="cardiffnlp/twitter-roberta-base-sentiment-latest",
+                    device=device
                 )
             except Exception:
                 api_logger.warning("Could not load sentiment analyzer, using TextBlob")
-                if TEXTBLOB_AVAILABLE:
+                # Loaded here, ahead of analyze_sentiment, so a broken install is caught
+                try:
+                    import textblob
                     self.sentiment_analyzer = "textblob"
-                else:
+                except ImportError:
                     self.sentiment_analyzer = None
             
             self.initialized = True
@@ -149,7 +202,33 @@ class NLPModelManager:
             api_logger.error(f"Failed to initialize NLP models: {str(e)}")
             self.initialized = False
             return False
+    
+    def classify_batch(self, texts: List[str]) -> List[Any]:
+        """
+        Run the crisis classifier over many texts in one pipeline call.
+        
+        The pipeline puts its model in eval mode and runs it without
+        autograd, so batching is what remains to gain.
+        
+        Args:
+            texts: Texts to classify
+            
+        Returns:
+            Classifier output per text, in input order
+        """
+        if not texts or not self.crisis_classifier:
+            return []
+        
+        return list(self.crisis_classifier(
+            texts,
+            batch_size=min(len(texts), _NLP_MAX_BATCH_SIZE),
+            truncation=True,
+            max_length=512
+        ))
+
 
+# Largest batch handed to the NLP pipeline at once
+_NLP_MAX_BATCH_SIZE = 64
 
 # Global NLP manager instance
 _nlp_manager = NLPModelManager()
@@ -175,55 +254,156 @@ def detect_mental_health_signals(
     if not text or len(text.strip()) < 10:
         return []
     
-    text_lower = text.lower()
+    use_nlp = bool(_nlp_manager.initialized and _nlp_manager.crisis_classifier)
+    return _signals_from_records(_detect_impl(text, use_nlp), datetime.now())
+
+
+def detect_mental_health_signals_batch(
+    texts: List[str],
+    context: Optional[Dict[str, Any]] = None
+) -> List[List[MentalHealthSignal]]:
+    """
+    Detect mental health signals from many texts.
+    
+    Same results as calling detect_mental_health_signals per text, but
+    all texts needing the NLP models go through the classifier together.
+    
+    Args:
+        texts: Texts to analyze (anonymized)
+        context: Optional context information
+        
+    Returns:
+        List of detected signals per text, in input order
+    """
+    detected_at = datetime.now()
+    results = []
+    pending = []
+    
+    for i, text in enumerate(texts):
+        if not text or len(text.strip()) < 10:
+            results.append([])
+            continue
+        results.append(_signals_from_records(_detect_impl(text, False), detected_at))
+        pending.append(i)
+    
+    # Use NLP models if available (optional enhancement)
+    if pending and _nlp_manager.initialized and _nlp_manager.crisis_classifier:
+        try:
+            classified = _nlp_manager.classify_batch([texts[i] for i in pending])
+        except Exception as e:
+            api_logger.warning(f"NLP model detection failed: {str(e)}")
+            classified = []
+        
+        for i, text_results in zip(pending, classified):
+            nlp_signals = _signals_from_classification(text_results, detected_at)
+            results[i] = _merge_signals(results[i], nlp_signals)
+    
+    return results
+
+
+def _signals_from_records(
+    records: Tuple[Tuple[Any, ...], ...],
+    detected_at: datetime
+) -> List[MentalHealthSignal]:
+    """MentalHealthSignal objects for _detect_impl records, stamped with detected_at."""
+    return [
+        MentalHealthSignal(
+            indicator_type=indicator_type,
+            severity=severity,
+            confidence=confidence,
+            keywords_found=list(keywords_found),
+            language_patterns=dict(language_patterns),
+            crisis_score=crisis_score,
+            detected_at=detected_at
+        )
+        for (
+            indicator_type, severity, confidence, keywords_found, language_patterns, crisis_score
+        ) in records
+    ]
+
+
+def _detect_impl(text: str, use_nlp: bool) -> Tuple[Tuple[Any, ...], ...]:
+    """
+    Signals detected in text, as records.
+    
+    Each record holds the MentalHealthSignal fields except detected_at,
+    which the caller stamps once for everything it detects.
+    
+    Results are deliberately not memoized: transcripts are rarely
+    repeated, and a cache would keep them in process memory.
+    """
+    text_lower, tokens = _tokenize(text)
+    now = datetime.now()
     signals = []
     
+    # Score every keyword category from one scan of the text
+    (
+        (crisis_score, crisis_keywords),
+        (anxiety_score, anxiety_keywords),
+        (depression_score, depression_keywords)
+    ) = _scan_all(text_lower)
+    
+    crisis_detected = crisis_score > 3.0
+    anxiety_detected = anxiety_score > 2.0
+    depression_detected = depression_score > 2.0
+    
+    # Language patterns are the same for every rule-based signal
+    if crisis_detected or anxiety_detected or depression_detected:
+        language_patterns = _extract_language_patterns(text, text_lower, tokens)
+    
     # Detect crisis signals
-    crisis_score, crisis_keywords = _calculate_crisis_score(text_lower)
-    if crisis_score > 3.0:
+    if crisis_detected:
         signals.append(MentalHealthSignal(
             indicator_type="CRISIS",
             severity=min(10.0, crisis_score),
             confidence=_calculate_confidence(crisis_score, crisis_keywords),
             keywords_found=crisis_keywords,
-            language_patterns=_extract_language_patterns(text),
+            language_patterns=language_patterns,
             crisis_score=crisis_score,
-            detected_at=datetime.now()
+            detected_at=now
         ))
     
     # Detect anxiety
-    anxiety_score, anxiety_keywords = _calculate_anxiety_score(text_lower)
-    if anxiety_score > 2.0:
+    if anxiety_detected:
         signals.append(MentalHealthSignal(
             indicator_type="ANXIETY",
             severity=min(10.0, anxiety_score),
             confidence=_calculate_confidence(anxiety_score, anxiety_keywords),
             keywords_found=anxiety_keywords,
-            language_patterns=_extract_language_patterns(text),
+            language_patterns=language_patterns,
             crisis_score=anxiety_score * 0.7,  # Anxiety contributes to crisis score
-            detected_at=datetime.now()
+            detected_at=now
         ))
     
     # Detect depression
-    depression_score, depression_keywords = _calculate_depression_score(text_lower)
-    if depression_score > 2.0:
+    if depression_detected:
         signals.append(MentalHealthSignal(
             indicator_type="DEPRESSION",
             severity=min(10.0, depression_score),
             confidence=_calculate_confidence(depression_score, depression_keywords),
             keywords_found=depression_keywords,
-            language_patterns=_extract_language_patterns(text),
+            language_patterns=language_patterns,
             crisis_score=depression_score * 0.8,  # Depression contributes more to crisis
-            detected_at=datetime.now()
+            detected_at=now
         ))
     
     # Use NLP models if available (optional enhancement)
-    if _nlp_manager.initialized and _nlp_manager.crisis_classifier:
+    if use_nlp:
         nlp_signals = _detect_with_nlp_models(text)
         # Merge NLP signals with rule-based signals
         signals = _merge_signals(signals, nlp_signals)
     
-    return signals
+    return tuple(
+        (
+            signal.indicator_type,
+            signal.severity,
+            signal.confidence,
+            tuple(signal.keywords_found),
+            tuple(signal.language_patterns.items()),
+            signal.crisis_score
+        )
+        for signal in signals
+    )
 
 
 def analyze_sentiment(text: str) -> Dict[str, Any]:
@@ -254,6 +434,7 @@ def analyze_sentiment(text: str) -> Dict[str, Any]:
         if isinstance(_nlp_manager.sentiment_analyzer, str) and _nlp_manager.sentiment_analyzer == "textblob":
             # Use TextBlob
             if TEXTBLOB_AVAILABLE:
+                from textblob import TextBlob
                 blob = TextBlob(text)
                 polarity = blob.sentiment.polarity
                 sentiment_result["sentiment_score"] = polarity
@@ -341,56 +522,55 @@ def calculate_crisis_score(
     return min(10.0, crisis_score)
 
 
-def _calculate_crisis_score(text: str) -> Tuple[float, List[str]]:
-    """Calculate crisis score from keywords."""
-    score = 0.0
-    keywords_found = []
-    
-    for keyword, weight in CRISIS_KEYWORDS.items():
-        if keyword in text:
-            score += weight
-            keywords_found.append(keyword)
-    
-    # Normalize score (divide by max possible if all keywords present)
-    max_score = sum(CRISIS_KEYWORDS.values()) * 0.5  # Threshold
-    normalized_score = min(10.0, (score / max_score) * 10.0) if max_score > 0 else 0.0
-    
-    return normalized_score, keywords_found
-
-
-def _calculate_anxiety_score(text: str) -> Tuple[float, List[str]]:
-    """Calculate anxiety score from keywords."""
-    score = 0.0
-    keywords_found = []
-    
-    for keyword, weight in ANXIETY_KEYWORDS.items():
-        if keyword in text:
-            score += weight
-            keywords_found.append(keyword)
+def _scan_all(text: str) -> Tuple[Tuple[float, List[str]], ...]:
+    """
+    Score the crisis, anxiety and depression keyword categories.
     
-    max_score = sum(ANXIETY_KEYWORDS.values()) * 0.3
-    normalized_score = min(10.0, (score / max_score) * 10.0) if max_score > 0 else 0.0
+    Args:
+        text: Lower-cased text to scan
+        
+    Returns:
+        (score, keywords_found) per category, in _KEYWORD_CATEGORIES order;
+        keywords are listed in category order
+    """
+    if AHOCORASICK_AVAILABLE:
+        found = {keyword for _, keyword in _KEYWORD_AUTOMATON.iter(text)}
+    else:
+        found = {keyword for keyword in _ALL_KEYWORDS if keyword in text}
+    
+    results = []
+    for keywords, max_score in _KEYWORD_CATEGORIES:
+        score = 0.0
+        keywords_found = []
+        
+        for keyword, weight in keywords:
+            if keyword in found:
+                score += weight
+                keywords_found.append(keyword)
+        
+        # Normalize score against the category threshold
+        normalized_score = min(10.0, (score / max_score) * 10.0) if max_score > 0 else 0.0
+        results.append((normalized_score, keywords_found))
     
-    return normalized_score, list(set(keywords_found))
+    return tuple(results)
 
 
-def _calculate_depression_score(text: str) -> Tuple[float, List[str]]:
-    """Calculate depression score from keywords."""
-    score = 0.0
-    keywords_found = []
-    
-    for keyword, weight in DEPRESSION_KEYWORDS.items():
-        if keyword in text:
-            score += weight
-            keywords_found.append(keyword)
-    
-    max_score = sum(DEPRESSION_KEYWORDS.values()) * 0.3
-    normalized_score = min(10.0, (score / max_score) * 10.0) if max_score > 0 else 0.0
+def _tokenize(text: str) -> Tuple[str, FrozenSet[str]]:
+    """
+    Lower-cased text and its whitespace-separated tokens.
     
-    return normalized_score, list(set(keywords_found))
+    Computed once per detection and handed to the language pattern
+    heuristics rather than cached across calls.
+    """
+    text_lower = text.lower()
+    return text_lower, frozenset(text_lower.split())
 
 
-def _extract_language_patterns(text: str) -> Dict[str, Any]:
+def _extract_language_patterns(
+    text: str,
+    text_lower: str,
+    tokens: FrozenSet[str]
+) -> Dict[str, Any]:
     """Extract language patterns that may indicate mental health issues."""
     patterns = {
         "exclamation_count": text.count("!"),
@@ -401,18 +581,16 @@ def _extract_language_patterns(text: str) -> Dict[str, Any]:
     }
     
     # Count negative words
-    negative_words = ["no", "not", "never", "nothing", "nobody", "nowhere", "can't", "won't", "don't"]
-    text_lower = text.lower()
-    patterns["negative_words"] = sum(1 for word in negative_words if word in text_lower)
+    patterns["negative_words"] = sum(1 for word in _NEGATION_WORDS if word in text_lower)
     
     # Count first-person pronouns (indicates self-focused language)
-    first_person = ["i", "me", "my", "myself"]
-    patterns["first_person_pronouns"] = sum(
-        1 for word in first_person if word in text_lower.split()
-    )
+    patterns["first_person_pronouns"] = sum(1 for word in _FIRST_PERSON_WORDS if word in tokens)
     
     # Calculate emotional intensity (based on punctuation and caps)
-    caps_count = sum(1 for c in text if c.isupper())
+    if text.isascii():
+        caps_count = len(text) - len(text.translate(_ASCII_UPPER_DELETE))
+    else:
+        caps_count = sum(map(str.isupper, text))
     patterns["emotional_intensity"] = (
         (patterns["exclamation_count"] + patterns["question_count"]) * 0.3 +
         (caps_count / len(text)) * 0.7 if text else 0.0
@@ -434,11 +612,8 @@ def _rule_based_sentiment(text: str) -> Dict[str, Any]:
     text_lower = text.lower()
     
     # Simple word counting approach
-    positive_words = ["good", "great", "happy", "better", "improve", "hope", "help", "support"]
-    negative_words = ["bad", "terrible", "awful", "horrible", "worse", "hopeless", "helpless", "fear"]
-    
-    positive_count = sum(1 for word in positive_words if word in text_lower)
-    negative_count = sum(1 for word in negative_words if word in text_lower)
+    positive_count = sum(1 for word in _POSITIVE_WORDS if word in text_lower)
+    negative_count = sum(1 for word in _NEGATIVE_WORDS if word in text_lower)
     
     total = positive_count + negative_count
     if total > 0:
@@ -452,17 +627,35 @@ def _rule_based_sentiment(text: str) -> Dict[str, Any]:
 
 def _detect_with_nlp_models(text: str) -> List[MentalHealthSignal]:
     """Detect signals using NLP models (if available)."""
-    signals = []
-    
     if not _nlp_manager.crisis_classifier:
-        return signals
+        return []
     
     try:
         # Classify text with crisis model
         results = _nlp_manager.crisis_classifier(text, truncation=True, max_length=512)
-        
+    except Exception as e:
+        api_logger.warning(f"NLP model detection failed: {str(e)}")
+        return []
+    
+    return _signals_from_classification(
+        results[0] if isinstance(results[0], list) else [results],
+        datetime.now()
+    )
+
+
+def _signals_from_classification(
+    text_results: Any,
+    detected_at: datetime
+) -> List[MentalHealthSignal]:
+    """Signals for one text's crisis classifier output (label/score dicts)."""
+    signals = []
+    
+    if isinstance(text_results, dict):
+        text_results = [text_results]
+    
+    try:
         # Extract relevant classifications
-        for result in results[0] if isinstance(results[0], list) else [results]:
+        for result in text_results:
             label = result.get("label", "").upper()
             score = result.get("score", 0.0)
             
@@ -476,7 +669,7 @@ def _detect_with_nlp_models(text: str) -> List[MentalHealthSignal]:
                         keywords_found=[],
                         language_patterns={},
                         crisis_score=score * 5,
-                        detected_at=datetime.now()
+                        detected_at=detected_at
                     ))
             elif "SAD" in label or "DEPRESSION" in label:
                 if score > 0.5:
@@ -487,7 +680,7 @@ def _detect_with_nlp_models(text: str) -> List[MentalHealthSignal]:
                         keywords_found=[],
                         language_patterns={},
                         crisis_score=score * 7,
-                        detected_at=datetime.now()
+                        detected_at=detected_at
                     ))
     except Exception as e:
         api_logger.warning(f"NLP model detection failed: {str(e)}")
@@ -505,20 +698,25 @@ def _merge_signals(
     
     merged = rule_based.copy()
     
+    # Position of the first rule-based signal of each indicator type
+    rule_index = {}
+    for i, rule_signal in enumerate(rule_based):
+        rule_index.setdefault(rule_signal.indicator_type, i)
+    
     # Add NLP signals that don't overlap with rule-based
     for nlp_signal in nlp_based:
-        # Check for overlap
-        overlap = False
-        for rule_signal in rule_based:
-            if rule_signal.indicator_type == nlp_signal.indicator_type:
-                # Merge scores
-                rule_signal.severity = (rule_signal.severity + nlp_signal.severity) / 2
-                rule_signal.confidence = max(rule_signal.confidence, nlp_signal.confidence)
-                overlap = True
-                break
-        
-        if not overlap:
+        i = rule_index.get(nlp_signal.indicator_type)
+        if i is None:
             merged.append(nlp_signal)
+            continue
+        
+        # Merge scores
+        rule_signal = merged[i]
+        merged[i] = replace(
+            rule_signal,
+            severity=(rule_signal.severity + nlp_signal.severity) / 2,
+            confidence=max(rule_signal.confidence, nlp_signal.confidence)
+        )
     
     return merged
 
@@ -1,6 +1,10 @@
 from typing import Dict, List
 import numpy as np
 
+# Below this many diseases the per-disease loop is cheaper than building
+# the trend and multiplier arrays
+_VECTORIZE_MIN_DISEASES = 128
+
 class PersonalRiskCalculator:
     """
     Calculate personalized health risks
@@ -34,20 +38,54 @@ class PersonalRiskCalculator:
         }
     
     def _calculate_base_risks(self, weather: Dict, hospital_trends: Dict) -> Dict:
-        risks = {}
         weather_multipliers = weather.get("disease_multipliers", {})
+        if len(hospital_trends) >= _VECTORIZE_MIN_DISEASES:
+            return self._calculate_base_risks_vectorized(weather_multipliers, hospital_trends)
         
+        risks = {}
         for disease, trend_data in hospital_trends.items():
             trend_factor = 1 + (trend_data["trend_percentage"] / 100)
             weather_mult = weather_multipliers.get(disease, 1.0)
             
-            base_risk = trend_factor * weather_mult
+            probability = trend_factor * weather_mult * 0.1
             risks[disease] = {
-                "base_probability": min(base_risk * 0.1, 0.95),
-                "risk_level": "HIGH" if base_risk * 0.1 > 0.5 else "LOW"
+                "base_probability": min(probability, 0.95),
+                "risk_level": "HIGH" if probability > 0.5 else "LOW"
             }
         return risks
 
+    def _calculate_base_risks_vectorized(self, weather_multipliers: Dict, hospital_trends: Dict) -> Dict:
+        """
+        Array form of the base risk loop for large disease sets.
+        
+        Evaluates the same float64 expression as the loop, so results are
+        identical.
+        """
+        diseases = list(hospital_trends)
+        count = len(diseases)
+        trends = np.fromiter(
+            (hospital_trends[disease]["trend_percentage"] for disease in diseases),
+            dtype=np.float64,
+            count=count
+        )
+        multipliers = np.fromiter(
+            (weather_multipliers.get(disease, 1.0) for disease in diseases),
+            dtype=np.float64,
+            count=count
+        )
+        
+        probabilities = (1 + trends / 100) * multipliers * 0.1
+        is_high = (probabilities > 0.5).tolist()
+        capped = np.minimum(probabilities, 0.95).tolist()
+        
+        return {
+            disease: {
+                "base_probability": probability,
+                "risk_level": "HIGH" if high else "LOW"
+            }
+            for disease, probability, high in zip(diseases, capped, is_high)
+        }
+
     def _generate_predictions(self, risks: Dict) -> List[Dict]:
         predictions = []
         for disease, data in risks.items():
@@ -1,10 +1,113 @@
 """SEIR epidemic model implementation."""
 import numpy as np
 import pandas as pd
-from scipy.integrate import odeint
 from typing import Dict, List, Tuple, Optional
-import matplotlib.pyplot as plt
-from datetime import datetime, timedelta
+from datetime import datetime
+
+# Numba compiles the ODE right-hand side and Jacobian to native code
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _seir_rhs(y, t, beta, sigma, gamma):
+        """SEIRModel.seir_equations with the rates passed as odeint args."""
+        S = y[0]
+        E = y[1]
+        I = y[2]
+        N = S + E + I + y[3]
+        
+        infection = beta * S * I / N
+        incubation = sigma * E
+        recovery = gamma * I
+        
+        dydt = np.empty(4)
+        dydt[0] = -infection
+        dydt[1] = infection - incubation
+        dydt[2] = incubation - recovery
+        dydt[3] = recovery
+        return dydt
+    
+    @njit(cache=True)
+    def _seir_jacobian(y, t, beta, sigma, gamma):
+        """SEIRModel.seir_jacobian with the rates passed as odeint args."""
+        S = y[0]
+        I = y[2]
+        N = S + y[1] + I + y[3]
+        N2 = N * N
+        
+        d_s = beta * I * (N - S) / N2
+        d_i = beta * S * (N - I) / N2
+        d_other = -beta * S * I / N2
+        
+        jac = np.zeros((4, 4))
+        jac[0, 0] = -d_s
+        jac[0, 1] = -d_other
+        jac[0, 2] = -d_i
+        jac[0, 3] = -d_other
+        jac[1, 0] = d_s
+        jac[1, 1] = d_other - sigma
+        jac[1, 2] = d_i
+        jac[1, 3] = d_other
+        jac[2, 1] = sigma
+        jac[2, 2] = -gamma
+        jac[3, 2] = gamma
+        return jac
+    
+    @njit(cache=True)
+    def _seir_ensemble_rhs(y, t, beta, sigma, gamma):
+        """SEIR equations for an ensemble stored member by member as (S, E, I, R)."""
+        dydt = np.empty_like(y)
+        for k in range(beta.shape[0]):
+            offset = 4 * k
+            S = y[offset]
+            E = y[offset + 1]
+            I = y[offset + 2]
+            N = S + E + I + y[offset + 3]
+            
+            infection = beta[k] * S * I / N
+            incubation = sigma[k] * E
+            recovery = gamma[k] * I
+            
+            dydt[offset] = -infection
+            dydt[offset + 1] = infection - incubation
+            dydt[offset + 2] = incubation - recovery
+            dydt[offset + 3] = recovery
+        return dydt
+    
+    # Compile (or load from the on-disk cache) at import rather than on the
+    # first simulation
+    _seir_rhs(np.ones(4), 0.0, 0.5, 0.2, 0.1)
+    _seir_jacobian(np.ones(4), 0.0, 0.5, 0.2, 0.1)
+    _seir_ensemble_rhs(np.ones(4), 0.0, np.full(1, 0.5), np.full(1, 0.2), np.full(1, 0.1))
+else:
+    def _seir_ensemble_rhs(y, t, beta, sigma, gamma):
+        """SEIR equations for an ensemble stored member by member as (S, E, I, R)."""
+        S, E, I, R = y.reshape(-1, 4).T
+        N = S + E + I + R
+        
+        infection = beta * S * I / N
+        incubation = sigma * E
+        recovery = gamma * I
+        
+        dydt = np.empty((len(S), 4))
+        dydt[:, 0] = -infection
+        dydt[:, 1] = infection - incubation
+        dydt[:, 2] = incubation - recovery
+        dydt[:, 3] = recovery
+        return dydt.ravel()
+
+
+# Column order of the DataFrame returned by SEIRModel.simulate
+_RESULT_COLUMNS = (
+    'day', 'susceptible', 'exposed', 'infected', 'recovered', 'date',
+    'new_infections', 'reproduction_number', 'outbreak_probability'
+)
+
 
 class SEIRModel:
     """Susceptible-Exposed-Infected-Recovered epidemic model."""
@@ -31,15 +134,53 @@ class SEIRModel:
         S, E, I, R = y
         N = S + E + I + R
         
-        dSdt = -self.beta * S * I / N
-        dEdt = self.beta * S * I / N - self.sigma * E
-        dIdt = self.sigma * E - self.gamma * I
-        dRdt = self.gamma * I
+        infection = self.beta * S * I / N
+        incubation = self.sigma * E
+        recovery = self.gamma * I
+        
+        return [-infection, infection - incubation, incubation - recovery, recovery]
+    
+    def seir_jacobian(self, y: List[float], t: float) -> np.ndarray:
+        """Analytic Jacobian of seir_equations with respect to (S, E, I, R)."""
+        S, E, I, R = y
+        N = S + E + I + R
+        N2 = N * N
+        
+        # Partial derivatives of the infection term beta*S*I/N; N depends
+        # on every compartment
+        d_s = self.beta * I * (N - S) / N2
+        d_i = self.beta * S * (N - I) / N2
+        d_other = -self.beta * S * I / N2
         
-        return [dSdt, dEdt, dIdt, dRdt]
+        return np.array([
+            [-d_s, -d_other, -d_i, -d_other],
+            [d_s, d_other - self.sigma, d_i, d_other],
+            [0.0, self.sigma, -self.gamma, 0.0],
+            [0.0, 0.0, self.gamma, 0.0]
+        ])
     
     def simulate(self, days: int = 365) -> pd.DataFrame:
         """Run SEIR simulation."""
+        columns = self._simulate_numeric(days)
+        columns['date'] = pd.date_range(datetime.now(), periods=days, freq='D')
+        
+        # Create results DataFrame once, with every column
+        return pd.DataFrame(columns, columns=_RESULT_COLUMNS)
+    
+    def _simulate_numeric(self, days: int) -> Dict[str, np.ndarray]:
+        """
+        Run the SEIR simulation without building a DataFrame.
+        
+        Args:
+            days: Number of days to simulate
+            
+        Returns:
+            Numeric result columns of simulate (everything but 'date') as
+            arrays keyed by column name
+        """
+        # Imported on first use; scipy.integrate adds ~0.2s to import time
+        from scipy.integrate import odeint
+        
         # Initial conditions
         y0 = [
             self.initial_susceptible,
@@ -51,28 +192,84 @@ class SEIRModel:
         # Time points
         t = np.linspace(0, days, days)
         
-        # Solve ODE
-        solution = odeint(self.seir_equations, y0, t)
+        # Solve ODE; LSODA uses the analytic Jacobian instead of
+        # finite-difference probing when it switches to stiff steps
+        if NUMBA_AVAILABLE:
+            solution = odeint(
+                _seir_rhs, y0, t,
+                args=(self.beta, self.sigma, self.gamma),
+                Dfun=_seir_jacobian
+            )
+        else:
+            solution = odeint(self.seir_equations, y0, t, Dfun=self.seir_jacobian)
+        
+        susceptible, exposed, infected, recovered = solution.T
+        columns = {
+            'day': np.arange(days),
+            'susceptible': susceptible,
+            'exposed': exposed,
+            'infected': infected,
+            'recovered': recovered
+        }
+        
+        # Calculate derived metrics on the solver output
+        new_infections = np.empty_like(infected)
+        new_infections[:1] = 0.0
+        np.subtract(infected[1:], infected[:-1], out=new_infections[1:])
+        columns['new_infections'] = new_infections
+        columns['reproduction_number'] = self.calculate_r_effective(columns)
+        columns['outbreak_probability'] = self.calculate_outbreak_probability(columns)
+        
+        return columns
+    
+    def simulate_ensemble(self, param_grid: np.ndarray, days: int = 365) -> np.ndarray:
+        """
+        Run the SEIR simulation for many parameter sets in one solver call.
+        
+        Every member starts from this model's initial conditions. The
+        members are advanced together, so the solver's per-step overhead is
+        paid once for the whole ensemble rather than once per member.
         
-        # Create results DataFrame
-        results = pd.DataFrame({
-            'day': range(days),
-            'susceptible': solution[:, 0],
-            'exposed': solution[:, 1],
-            'infected': solution[:, 2],
-            'recovered': solution[:, 3],
-            'date': [datetime.now() + timedelta(days=i) for i in range(days)]
-        })
+        Args:
+            param_grid: Array of shape (K, 3), one (beta, sigma, gamma) row
+                per member
+            days: Number of days to simulate
+            
+        Returns:
+            Array of shape (K, days, 4) holding the susceptible, exposed,
+            infected and recovered curves of each member, sampled at the
+            same time points as simulate
+        """
+        from scipy.integrate import odeint
         
-        # Calculate derived metrics
-        results['new_infections'] = results['infected'].diff().fillna(0)
-        results['reproduction_number'] = self.calculate_r_effective(results)
-        results['outbreak_probability'] = self.calculate_outbreak_probability(results)
+        params = np.asarray(param_grid, dtype=float)
+        if params.ndim != 2 or params.shape[1] != 3:
+            raise ValueError(f"param_grid must have shape (K, 3), got {params.shape}")
+        members = params.shape[0]
+        if members == 0:
+            raise ValueError("param_grid must hold at least one parameter set")
+        beta, sigma, gamma = np.ascontiguousarray(params.T)
         
-        return results
+        y0 = np.tile(
+            np.array([
+                self.initial_susceptible,
+                self.initial_exposed,
+                self.initial_infected,
+                self.initial_recovered
+            ], dtype=float),
+            members
+        )
+        t = np.linspace(0, days, days)
+        
+        # Each member's four compartments are adjacent in the state, so the
+        # Jacobian is block diagonal with bandwidth 3 and LSODA estimates it
+        # from 7 right-hand-side calls whatever the ensemble size
+        solution = odeint(_seir_ensemble_rhs, y0, t, args=(beta, sigma, gamma), ml=3, mu=3)
+        
+        return solution.reshape(days, members, 4).transpose(1, 0, 2)
     
     def calculate_r_effective(self, results: pd.DataFrame) -> pd.Series:
-        """Calculate effective reproduction number."""
+        """Calculate effective reproduction number (also takes a dict of column arrays)."""
         # Simplified R_effective calculation
         S = results['susceptible']
         N = self.population
@@ -81,7 +278,7 @@ class SEIRModel:
         return R0 * (S / N)
     
     def calculate_outbreak_probability(self, results: pd.DataFrame) -> pd.Series:
-        """Calculate outbreak probability based on current state."""
+        """Calculate outbreak probability based on current state (also takes a dict of column arrays)."""
         infected = results['infected']
         exposed = results['exposed']
         
@@ -117,13 +314,14 @@ class SEIRModel:
         # Update initial conditions with current data
         self.initial_infected = current_infected
         
-        # Run short-term simulation
-        results = self.simulate(days=days_ahead)
+        # Run short-term simulation; only the numeric columns are needed
+        results = self._simulate_numeric(days=days_ahead)
         
         # Calculate risk metrics
-        max_infected = results['infected'].max()
-        peak_day = results.loc[results['infected'].idxmax(), 'day']
-        final_outbreak_prob = results['outbreak_probability'].iloc[-1]
+        infected = results['infected']
+        max_infected = infected.max()
+        peak_day = results['day'][infected.argmax()]
+        final_outbreak_prob = results['outbreak_probability'][-1]
         
         return {
             'max_predicted_infected': max_infected,
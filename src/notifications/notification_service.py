@@ -1,3 +1,5 @@
+import atexit
+import weakref
 from typing import Dict
 from datetime import datetime
 
@@ -6,8 +8,15 @@ class NotificationService:
     Multi-channel notification system
     """
     
+    # Services holding an open log file, closed at exit. Weak references,
+    # so registering for exit does not keep a service alive
+    _open_services = weakref.WeakSet()
+    
     def __init__(self):
         self.log_file = "notifications.log"
+        # Opened on the first message and kept open; line buffered so every
+        # message reaches the file as soon as it is written
+        self._log_fh = None
 
     async def send_prediction_alert(self, patient_id: str, prediction: Dict):
         message = f"[{datetime.now()}] ALERT to {patient_id}: {prediction.get('disease', 'Health')} risk is {prediction.get('risk_level', 'UNKNOWN')}. {prediction.get('recommendations', [])}"
@@ -20,5 +29,21 @@ class NotificationService:
         self._log_to_file(message)
         
     def _log_to_file(self, message: str):
-        with open(self.log_file, "a") as f:
-            f.write(message + "\n")
+        if self._log_fh is None:
+            self._log_fh = open(self.log_file, "a", buffering=1)
+            NotificationService._open_services.add(self)
+        self._log_fh.write(message + "\n")
+
+    def close(self):
+        """Close the notification log file."""
+        if self._log_fh is not None:
+            self._log_fh.close()
+            self._log_fh = None
+            NotificationService._open_services.discard(self)
+
+
+@atexit.register
+def _close_open_services():
+    """Close the log files of services still open at interpreter exit."""
+    for service in list(NotificationService._open_services):
+        service.close()
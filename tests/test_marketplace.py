@@ -13,6 +13,7 @@ from src.database.resource_models import (
 )
 from src.database.models import Location
 from src.marketplace.matching_engine import ResourceMatchingEngine
+from src.marketplace.marketplace_service import MarketplaceService
 from src.database.connection import get_async_session
 
 
@@ -241,3 +242,19 @@ async def test_match_score_calculation(db_session: AsyncSession):
     assert score.urgency_score > 0
     assert score.reliability_score > 0
 
+
+
+def test_marketplace_service_match_resources():
+    """Test indexed criteria matching in the marketplace service stub."""
+    service = MarketplaceService()
+    service.add_resource({"type": "ICU_BED", "city": "Mumbai", "tags": ["adult"]})
+    service.add_resource({"type": "ICU_BED", "city": "Pune"})
+    service.add_resource({"type": "N95_MASK", "city": "Mumbai"})
+    
+    assert len(service.match_resources({"type": "ICU_BED"})) == 2
+    assert service.match_resources({"type": "N95_MASK", "city": "Mumbai"}) == [
+        {"type": "N95_MASK", "city": "Mumbai"}
+    ]
+    assert len(service.match_resources({"tags": ["adult"]})) == 1
+    assert service.match_resources({"type": "VENTILATOR"}) == []
+    assert len(service.match_resources({})) == 3
@@ -0,0 +1,344 @@
+"""
+Tests for Mental Health surveillance algorithms.
+"""
+
+from copy import deepcopy
+from dataclasses import replace
+from datetime import datetime
+
+import numpy as np
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.models import Location
+from src.mental_health import signal_detection
+from src.mental_health.anonymization import (
+    anonymize_counseling_session, anonymize_counseling_sessions_batch
+)
+from src.mental_health.clustering import (
+    Hotspot, HotspotBatch, bulk_persist_hotspots, detect_hotspots
+)
+from src.mental_health.models import (
+    MentalHealthHotspot, MentalHealthIndicator, MentalHealthResource, MentalHealthSeverity
+)
+from src.mental_health import resource_recommender
+from src.mental_health.resource_recommender import ResourceRecommendationEngine
+from src.mental_health.signal_detection import (
+    detect_mental_health_signals, detect_mental_health_signals_batch
+)
+
+
+def test_detect_hotspots_with_enum_indicators():
+    """Test hotspot indicators keep enum members distinct and intact."""
+    location_coordinates = {"loc-1": (19.0760, 72.8777), "loc-2": (19.0800, 72.8800)}
+    data_points = [
+        {
+            "location_id": "loc-1" if i % 2 else "loc-2",
+            "crisis_score": 8.0,
+            "primary_indicators": [MentalHealthIndicator.CRISIS, MentalHealthIndicator.ANXIETY],
+        }
+        for i in range(10)
+    ]
+    data_points[0]["primary_indicators"] = ["DEPRESSION", MentalHealthIndicator.CRISIS]
+    
+    hotspots = detect_hotspots(data_points, location_coordinates, min_samples=5)
+    
+    assert len(hotspots) == 1
+    assert hotspots[0].primary_indicators == [
+        MentalHealthIndicator.CRISIS, MentalHealthIndicator.ANXIETY, "DEPRESSION"
+    ]
+    assert all(
+        isinstance(indicator, MentalHealthIndicator)
+        for indicator in hotspots[0].primary_indicators[:2]
+    )
+    assert hotspots[0].contributing_factors["indicator_distribution"] == {
+        MentalHealthIndicator.CRISIS: 10,
+        MentalHealthIndicator.ANXIETY: 9,
+        "DEPRESSION": 1,
+    }
+
+
+def test_hotspot_batch_round_trip():
+    """Test HotspotBatch keeps records, order and list-valued fields intact."""
+    detected = datetime(2024, 1, 1)
+    hotspots = [
+        Hotspot(
+            location_id=f"loc-{i}",
+            latitude=19.0 + i,
+            longitude=72.0 + i,
+            hotspot_score=score,
+            # Equal-length lists must stay one object per row, not a 2-D array
+            primary_indicators=["ANXIETY", "DEPRESSION"],
+            affected_population_estimate=100 * (i + 1),
+            severity=severity,
+            detected_date=detected,
+            trend="STABLE",
+            contributing_factors={"cluster_size": i + 1},
+        )
+        for i, (score, severity) in enumerate([
+            (3.0, MentalHealthSeverity.MILD),
+            (8.5, MentalHealthSeverity.SEVERE),
+            (6.0, MentalHealthSeverity.MODERATE),
+        ])
+    ]
+    
+    batch = HotspotBatch.from_hotspots(hotspots)
+    
+    assert len(batch) == 3
+    assert batch.primary_indicators.shape == (3,)
+    assert batch.as_records() == hotspots
+    
+    high = batch.filter_by_score(6.0)
+    assert high.as_records() == [hotspots[1], hotspots[2]]
+    assert high.as_records()[0].primary_indicators is hotspots[1].primary_indicators
+    assert batch.select(np.array([2, 0])).as_records() == [hotspots[2], hotspots[0]]
+    assert batch.filter_by_score(9.0).as_records() == []
+    assert HotspotBatch.from_hotspots([]).as_records() == []
+
+
+@pytest.mark.asyncio
+async def test_bulk_persist_hotspots(db_session: AsyncSession):
+    """Test batched hotspot inserts keep input order and merge shared locations."""
+    locations = [
+        Location(
+            name=f"City {i}",
+            latitude=19.0 + i,
+            longitude=72.0 + i,
+            country="India",
+            population=1000000,
+        )
+        for i in range(3)
+    ]
+    db_session.add_all(locations)
+    await db_session.flush()
+    
+    def make_hotspot(location, score, severity):
+        return Hotspot(
+            location_id=str(location.id),
+            latitude=location.latitude,
+            longitude=location.longitude,
+            hotspot_score=score,
+            primary_indicators=[f"INDICATOR_{score:g}"],
+            affected_population_estimate=500,
+            severity=severity,
+            detected_date=datetime(2024, 1, 1),
+            trend="STABLE",
+            contributing_factors={"cluster_size": 5},
+        )
+    
+    hotspots = [
+        make_hotspot(locations[2], 4.0, MentalHealthSeverity.MILD),
+        make_hotspot(locations[0], 6.0, MentalHealthSeverity.MODERATE),
+        make_hotspot(locations[2], 9.0, MentalHealthSeverity.SEVERE),
+        make_hotspot(locations[1], 5.0, MentalHealthSeverity.MODERATE),
+    ]
+    
+    records = await bulk_persist_hotspots(db_session, hotspots)
+    
+    assert [str(record.location_id) for record in records] == [
+        hotspot.location_id for hotspot in hotspots
+    ]
+    assert records[0] is records[2]
+    assert len({record.id for record in records}) == 3
+    # The later cluster at a shared location updates the row it joins
+    assert records[0].hotspot_score == 9.0
+    assert records[0].severity == MentalHealthSeverity.SEVERE
+    assert records[0].primary_indicators == ["INDICATOR_9"]
+    assert [record.hotspot_score for record in records[1:]] == [6.0, 9.0, 5.0]
+    
+    row_count = await db_session.scalar(
+        select(func.count()).select_from(MentalHealthHotspot)
+    )
+    assert row_count == 3
+    assert await bulk_persist_hotspots(db_session, []) == []
+
+
+class _StubCrisisClassifier:
+    """Crisis classifier stand-in returning every label score per text."""
+    
+    def _scores(self, text):
+        return [
+            {"label": "fear", "score": 0.9 if "panic" in text else 0.1},
+            {"label": "sadness", "score": 0.8 if "hopeless" in text or "down" in text else 0.2},
+        ]
+    
+    def __call__(self, inputs, **kwargs):
+        if isinstance(inputs, str):
+            return [self._scores(inputs)]
+        return [self._scores(text) for text in inputs]
+
+
+def test_detect_signals_batch_matches_single(monkeypatch):
+    """Test batch detection gives the per-text results with one timestamp."""
+    monkeypatch.setattr(signal_detection._nlp_manager, "crisis_classifier", _StubCrisisClassifier())
+    monkeypatch.setattr(signal_detection._nlp_manager, "initialized", True)
+    texts = [
+        "",
+        "too short",
+        "          ",
+        "I keep having a panic attack and feel anxious and worried all the time",
+        "I feel hopeless and worthless, so tired and empty",
+        "Feeling really down about everything lately",
+        "Had a lovely walk in the park with friends today",
+        "I keep having a panic attack and feel anxious and worried all the time",
+    ]
+    
+    batch = detect_mental_health_signals_batch(texts)
+    single = [detect_mental_health_signals(text) for text in texts]
+    
+    assert len(batch) == len(texts)
+    assert batch[:3] == [[], [], []]
+    assert [signal.indicator_type for signal in batch[5]] == ["DEPRESSION"]
+    for batch_signals, single_signals in zip(batch, single):
+        assert [replace(signal, detected_at=None) for signal in batch_signals] == [
+            replace(signal, detected_at=None) for signal in single_signals
+        ]
+    assert len({signal.detected_at for signals in batch for signal in signals}) == 1
+
+
+def test_detect_signals_recovers_after_classifier_error(monkeypatch):
+    """Test a failed NLP call does not stick to the text it failed on."""
+    calls = []
+    
+    def flaky_classifier(text, **kwargs):
+        calls.append(text)
+        if len(calls) == 1:
+            raise RuntimeError("model unavailable")
+        return [[{"label": "fear", "score": 0.9}]]
+    
+    monkeypatch.setattr(signal_detection._nlp_manager, "crisis_classifier", flaky_classifier)
+    monkeypatch.setattr(signal_detection._nlp_manager, "initialized", True)
+    text = "I feel a bit off lately and cannot focus on anything"
+    
+    assert detect_mental_health_signals(text) == []
+    assert [signal.indicator_type for signal in detect_mental_health_signals(text)] == ["ANXIETY"]
+    assert len(calls) == 2
+
+
+def test_anonymize_counseling_sessions_batch_matches_single():
+    """Test batch anonymization matches per-session results without mutating input."""
+    ages = [
+        -1, 0, 12, 12.9, 13, 17, 17.5, 18, 24, 24.99, 25, 34, 35,
+        44, 45, 54, 55, 64, 64.9, 65, 120, True, float("nan"),
+    ]
+    sessions = [
+        {
+            "session_id": f"s-{i}",
+            "patient_id": f"p-{i}",
+            "age": age,
+            "gender": "female" if i % 2 else "X",
+            "location": "12 Main St, Pune, Maharashtra",
+            "primary_indicator": "ANXIETY",
+            "notes": "Client Jane Doe reports stress at work",
+            "metadata": {"clinic": "north", "phone": "555-123-4567"},
+        }
+        for i, age in enumerate(ages)
+    ]
+    sessions += [
+        {"session_id": "s-str", "age": "30", "gender_group": "M"},
+        {"session_id": "s-group", "age_group": "25-34"},
+        {"session_id": "s-none", "severity": "MILD"},
+    ]
+    original = deepcopy(sessions)
+    
+    batch = anonymize_counseling_sessions_batch(sessions)
+    
+    assert batch == [anonymize_counseling_session(session) for session in original]
+    assert sessions == original
+    assert [result.get("age_group") for result in batch[:len(ages)]] == [
+        "0-12", "0-12", "0-12", "0-12", "13-17", "13-17", "13-17", "18-24", "18-24",
+        "18-24", "25-34", "25-34", "35-44", "35-44", "45-54", "45-54", "55-64",
+        "55-64", "55-64", "65+", "65+", "0-12", "65+",
+    ]
+    assert anonymize_counseling_sessions_batch([]) == []
+
+
+@pytest.mark.asyncio
+async def test_recommend_resources_for_hotspots(db_session: AsyncSession, monkeypatch):
+    """Test batched recommendations across mixed, repeated and empty locations."""
+    locations = [
+        Location(
+            name=f"City {i}",
+            latitude=19.0 + i,
+            longitude=72.0 + i,
+            country="India",
+            population=1000000,
+        )
+        for i in range(3)
+    ]
+    db_session.add_all(locations)
+    await db_session.flush()
+    
+    for location, resource_count in zip(locations[:2], (2, 1)):
+        for k in range(resource_count):
+            db_session.add(MentalHealthResource(
+                location_id=location.id,
+                resource_type="crisis_hotline",
+                name=f"{location.name} Hotline {k}",
+                services_offered=["crisis support"],
+                availability_status="AVAILABLE",
+                capacity=5,
+            ))
+    await db_session.flush()
+    
+    def make_hotspot(location_id):
+        return MentalHealthHotspot(
+            location_id=location_id,
+            primary_indicators=[MentalHealthIndicator.CRISIS],
+            severity=MentalHealthSeverity.SEVERE,
+            hotspot_score=8.0,
+        )
+    
+    first, second, without_resources = (location.id for location in locations)
+    engine = ResourceRecommendationEngine()
+    
+    # Every location is fetched by one query, whatever form its id takes
+    queries = []
+    execute = db_session.execute
+    
+    async def counting_execute(*args, **kwargs):
+        queries.append(args)
+        return await execute(*args, **kwargs)
+    
+    monkeypatch.setattr(db_session, "execute", counting_execute)
+    
+    results = await engine.recommend_resources_for_hotspots(
+        [
+            make_hotspot(first),
+            make_hotspot(str(first)),
+            make_hotspot(str(second)),
+            make_hotspot(without_resources),
+            make_hotspot(first),
+        ],
+        db_session,
+    )
+    
+    assert len(queries) == 1
+    names = [sorted(rec.resource_name for rec in recs) for recs in results]
+    assert names == [
+        ["City 0 Hotline 0", "City 0 Hotline 1"],
+        ["City 0 Hotline 0", "City 0 Hotline 1"],
+        ["City 1 Hotline 0"],
+        [],
+        ["City 0 Hotline 0", "City 0 Hotline 1"],
+    ]
+
+
+@pytest.mark.asyncio
+async def test_national_resources_are_fresh_copies():
+    """Test editing returned national resources leaves the shared table intact."""
+    engine = ResourceRecommendationEngine()
+    original = [dict(resource) for resource in resource_recommender._NATIONAL_RESOURCES]
+    
+    for indicator in (None, MentalHealthIndicator.CRISIS):
+        resources = await engine.get_national_resources(None, indicator)
+        for resource in resources:
+            resource["contact"] = "changed"
+            resource["services"].append("changed")
+    
+    assert [dict(resource) for resource in resource_recommender._NATIONAL_RESOURCES] == original
+    assert all(
+        "changed" not in resource["services"]
+        for resource in resource_recommender._NATIONAL_RESOURCES
+    )
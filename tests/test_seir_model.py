@@ -0,0 +1,38 @@
+"""
+Tests for the SEIR epidemic model.
+"""
+
+import numpy as np
+import pytest
+
+from src.models.seir_model import SEIRModel
+
+
+def test_simulate_ensemble_matches_simulate():
+    """Test each ensemble member follows simulate() for its parameters."""
+    param_grid = np.array([
+        [0.5, 0.2, 0.1],
+        [0.3, 0.25, 0.15],
+        [0.9, 0.1, 0.05],
+    ])
+    model = SEIRModel(population=50000, initial_infected=5)
+    
+    ensemble = model.simulate_ensemble(param_grid, days=120)
+    
+    assert ensemble.shape == (3, 120, 4)
+    for member, (beta, sigma, gamma) in zip(ensemble, param_grid):
+        model.update_parameters(beta, sigma, gamma)
+        expected = model.simulate(days=120)[
+            ['susceptible', 'exposed', 'infected', 'recovered']
+        ].to_numpy()
+        np.testing.assert_allclose(member, expected, rtol=1e-5, atol=1e-3)
+
+
+def test_simulate_ensemble_rejects_bad_param_grid():
+    """Test malformed or empty parameter grids are rejected."""
+    model = SEIRModel()
+    
+    with pytest.raises(ValueError):
+        model.simulate_ensemble(np.array([0.5, 0.2, 0.1]))
+    with pytest.raises(ValueError):
+        model.simulate_ensemble(np.empty((0, 3)))
@@ -0,0 +1,34 @@
+"""
+Tests for weather-based health impact analysis.
+"""
+
+from src.integrations.weather_service import WeatherService
+
+
+def test_health_impacts_batch_matches_single():
+    """Test batch impacts match get_health_impact for every reading."""
+    readings = [
+        {"temp": 35.0, "humidity": 80, "condition": "Thunderstorm"},
+        {"temp": 2.5, "humidity": 20, "condition": "clear sky"},
+        {"temp": 30.0, "humidity": 70, "condition": "Light RAIN"},
+        {"temp": 5.0, "humidity": 30, "condition": "overcast clouds"},
+        {"temp": 30.1, "humidity": 29.9, "condition": "storm and rain"},
+        {"temp": 4.9, "humidity": 70.1, "condition": "drizzle"},
+        {"temp": 18, "humidity": 50, "condition": ""},
+    ]
+    service = WeatherService()
+    
+    batch = service.get_health_impacts_batch(
+        [reading["temp"] for reading in readings],
+        [reading["humidity"] for reading in readings],
+        [reading["condition"] for reading in readings],
+    )
+    
+    assert batch == [service.get_health_impact(reading) for reading in readings]
+    assert batch[-1] == []
+    assert len(batch[0]) == 3
+
+
+def test_health_impacts_batch_empty():
+    """Test an empty batch gives no impacts."""
+    assert WeatherService().get_health_impacts_batch([], [], []) == []